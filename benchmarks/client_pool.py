@@ -0,0 +1,87 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Compare one connection per request against the pooled Client session.
+
+Usage: python -m benchmarks.client_pool [--requests 200] [--no-tls]
+"""
+
+import argparse
+import statistics
+import time
+import requests
+from okazaki.api import Client
+from benchmarks.stand_in import start_server
+
+
+def measure(call, count):
+    """Run call count times and return the per request latencies in ms."""
+    latencies = []
+
+    for _ in range(count):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return latencies
+
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+
+    print(
+        f"{name:<24} mean {statistics.mean(latencies):8.3f} ms"
+        f"   p50 {statistics.median(latencies):8.3f} ms   p95 {p95:8.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--no-tls", action="store_true")
+    args = parser.parse_args()
+
+    server, base_url, cert_path = start_server(tls=not args.no_tls)
+    verify = cert_path if cert_path else True
+    url = f"{base_url}/repos/clivern/okazaki/issues"
+
+    client = Client(github_api=base_url)
+    session = client.get_session()
+    session.verify = verify
+    session.trust_env = False
+
+    report(
+        "new connection/request",
+        measure(lambda: requests.get(url, verify=verify).json(), args.requests),
+    )
+    report("pooled client session", measure(lambda: client._get(url), args.requests))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
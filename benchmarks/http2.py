@@ -0,0 +1,97 @@
+"""
+Compare HTTP/1.1 connection pooling against HTTP/2 multiplexing when the
+number of connections per host is capped, as egress proxies do.
+
+Usage: python -m benchmarks.http2 [--requests 400] [--threads 32]
+       [--connections 4] [--delay 0.02]
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from okazaki.api import Client
+from okazaki.api import Http2Session
+from benchmarks.stand_in import StandInHandler, start_h2_server, start_server
+
+
+def measure(client, url, count, threads):
+    """Send count GETs from the given number of threads and return the latencies."""
+    latencies = []
+    lock = threading.Lock()
+    remaining = iter(range(count))
+
+    def worker():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+
+            start = time.perf_counter()
+            client._get(url)
+
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+
+    for thread in workers:
+        thread.start()
+
+    for thread in workers:
+        thread.join()
+
+    return latencies, time.perf_counter() - start
+
+
+def report(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+
+    print(
+        f"{name:<28} {len(latencies) / elapsed:8.1f} req/s"
+        f"   p50 {statistics.median(latencies):8.3f} ms   p95 {p95:8.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    handler = type("DelayedHandler", (StandInHandler,), {"delay": args.delay})
+    server, base_url, cert_path = start_server(handler=handler)
+
+    client = Client(pool_maxsize=args.connections, pool_block=True)
+    session = client.get_session()
+    session.verify = cert_path
+    session.trust_env = False
+
+    report(
+        f"HTTP/1.1, {args.connections} connections",
+        *measure(client, f"{base_url}/repos/a/b/issues", args.requests, args.threads),
+    )
+
+    listener, h2_base_url, h2_cert_path = start_h2_server(args.delay)
+    h2_session = Http2Session(max_connections=1, verify=h2_cert_path)
+
+    client = Client(http2=True)
+    client.get_session = lambda: h2_session
+
+    report(
+        "HTTP/2, 1 connection",
+        *measure(
+            client, f"{h2_base_url}/repos/a/b/issues", args.requests, args.threads
+        ),
+    )
+
+    server.shutdown()
+    listener.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Measure the cost of minting app JWTs with and without the key and token cache.
+
+Usage: python -m benchmarks.jwt_signing [--iterations 500]
+"""
+
+import argparse
+import calendar
+import os
+import tempfile
+import time
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from okazaki.api import Client
+
+
+def create_private_key(directory):
+    """Write a 2048 bit RSA key like the ones GitHub issues and return its path."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path = os.path.join(directory, "app.pem")
+
+    with open(path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.TraditionalOpenSSL,
+                serialization.NoEncryption(),
+            )
+        )
+
+    return path
+
+
+def sign_uncached(private_key_path, app_id):
+    """The previous behaviour: read, parse and sign on every call."""
+    with open(private_key_path, "r") as f:
+        secret_key = f.read()
+
+    now = calendar.timegm(time.gmtime())
+
+    return jwt.encode(
+        {"iat": now - 60, "exp": now + 600, "iss": app_id},
+        secret_key,
+        algorithm="RS256",
+    )
+
+
+def measure(name, call, iterations):
+    start = time.perf_counter()
+
+    for _ in range(iterations):
+        call()
+
+    elapsed = (time.perf_counter() - start) * 1000 / iterations
+
+    print(f"{name:<32} {elapsed:10.4f} ms/token")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    path = create_private_key(tempfile.mkdtemp())
+    client = Client()
+    key = client._get_private_key(path)
+
+    def sign_cached_key():
+        now = calendar.timegm(time.gmtime())
+        jwt.encode({"iat": now - 60, "exp": now + 600, "iss": 1}, key, "RS256")
+
+    measure("read + parse + sign", lambda: sign_uncached(path, 1), args.iterations)
+    measure("cached key, sign", sign_cached_key, args.iterations)
+    measure(
+        "cached key, reused token",
+        lambda: client._get_jwt_token(path, 1),
+        args.iterations,
+    )
+
+
+if __name__ == "__main__":
+    main()
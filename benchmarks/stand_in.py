@@ -0,0 +1,225 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import datetime
+import ipaddress
+import json
+import os
+import socket
+import ssl
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import DataReceived, RequestReceived, StreamEnded
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """A keep-alive handler answering every request with a small JSON body."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    delay = 0.0
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length", 0))
+
+        if length:
+            self.rfile.read(length)
+
+        if self.delay:
+            time.sleep(self.delay)
+
+        body = json.dumps({"path": self.path, "ok": True}).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_certificate(directory):
+    """Create a self-signed certificate for 127.0.0.1 and return its paths."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName(
+                [x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]
+            ),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.TraditionalOpenSSL,
+                serialization.NoEncryption(),
+            )
+        )
+
+    return cert_path, key_path
+
+
+def start_server(tls=True, handler=StandInHandler):
+    """
+    Start a stand-in GitHub API on a random local port.
+
+    Returns the server, its base URL and the certificate path (None without TLS).
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    cert_path = None
+
+    if tls:
+        cert_path, key_path = create_certificate(tempfile.mkdtemp())
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_path, key_path)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    scheme = "https" if tls else "http"
+
+    return server, f"{scheme}://127.0.0.1:{server.server_port}", cert_path
+
+
+def _serve_h2(sock, delay):
+    """Answer the streams of one HTTP/2 connection, each after the delay."""
+    conn = H2Connection(config=H2Configuration(client_side=False))
+    lock = threading.Lock()
+    paths = {}
+
+    def reply(stream_id):
+        body = json.dumps({"path": paths.pop(stream_id), "ok": True}).encode()
+
+        with lock:
+            conn.send_headers(
+                stream_id,
+                [
+                    (":status", "200"),
+                    ("content-type", "application/json"),
+                    ("content-length", str(len(body))),
+                ],
+            )
+            conn.send_data(stream_id, body, end_stream=True)
+            sock.sendall(conn.data_to_send())
+
+    with lock:
+        conn.initiate_connection()
+        sock.sendall(conn.data_to_send())
+
+    try:
+        while True:
+            data = sock.recv(65535)
+
+            if not data:
+                break
+
+            with lock:
+                events = conn.receive_data(data)
+
+                for event in events:
+                    if isinstance(event, RequestReceived):
+                        paths[event.stream_id] = dict(event.headers)[b":path"].decode()
+                    elif isinstance(event, DataReceived):
+                        conn.acknowledge_received_data(
+                            event.flow_controlled_length, event.stream_id
+                        )
+                    elif isinstance(event, StreamEnded):
+                        # Answer off the reading thread so streams overlap
+                        threading.Timer(delay, reply, (event.stream_id,)).start()
+
+                sock.sendall(conn.data_to_send())
+    except (OSError, ssl.SSLError):
+        pass
+    finally:
+        sock.close()
+
+
+def start_h2_server(delay=0.0):
+    """
+    Start a stand-in GitHub API speaking HTTP/2 over TLS on a random local port.
+
+    Returns the listening socket, its base URL and the certificate path.
+    """
+    cert_path, key_path = create_certificate(tempfile.mkdtemp())
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    context.set_alpn_protocols(["h2"])
+
+    listener = socket.create_server(("127.0.0.1", 0))
+
+    def accept():
+        while True:
+            try:
+                sock, _ = listener.accept()
+            except OSError:
+                return
+
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            try:
+                sock = context.wrap_socket(sock, server_side=True)
+            except (OSError, ssl.SSLError):
+                sock.close()
+                continue
+
+            threading.Thread(target=_serve_h2, args=(sock, delay), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+
+    return listener, f"https://127.0.0.1:{listener.getsockname()[1]}", cert_path
@@ -0,0 +1,77 @@
+"""
+Compare the per term substring search of the auto triage rules against the
+compiled TermMatcher.
+
+Usage: python -m benchmarks.triage_matcher [--terms 400] [--body 6000] [--items 200]
+"""
+
+import argparse
+import random
+import string
+import time
+from okazaki.util import TermMatcher
+
+WORDS = (
+    "the application crashes when opening the settings page after the upgrade "
+    "to the latest version please look into this thanks"
+).split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--terms", type=int, default=400)
+    parser.add_argument("--body", type=int, default=6000)
+    parser.add_argument("--items", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(0)
+    terms = [
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(5, 12)))
+        for _ in range(args.terms)
+    ]
+    rules = [terms[i : i + 10] for i in range(0, len(terms), 10)]
+    items = []
+
+    for _ in range(args.items):
+        body = ""
+
+        while len(body) < args.body:
+            body += random.choice(WORDS + random.choices(terms, k=1)) + " "
+
+        items.append(("Crash on start", body))
+
+    start = time.perf_counter()
+    expected = []
+
+    # The loop the plugin used before, texts are lowered once per item
+    for title, body in items:
+        title, body = title.lower(), body.lower()
+        expected.append(
+            [
+                index
+                for index, rule_terms in enumerate(rules)
+                if any(
+                    term.lower() in title or term.lower() in body for term in rule_terms
+                )
+            ]
+        )
+
+    naive = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = TermMatcher(rules)
+    compiled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = [matcher.match(title, body) for title, body in items]
+    matched = time.perf_counter() - start
+
+    assert result == expected
+
+    print(f"substring search per term {naive / args.items * 1000:8.3f} ms/item")
+    print(f"compiled matcher          {matched / args.items * 1000:8.3f} ms/item")
+    print(f"compile once              {compiled * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,17 +23,25 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import requests
 from okazaki.util import Logger
+from okazaki.api.session import SessionPool
 
 
 class Tyran(object):
     """Tyran Client https://github.com/Clivern/Tyran"""
 
-    def __init__(self, base_url, api_key, logger=None):
+    def __init__(self, base_url, api_key, logger=None, pool_maxsize=10, http2=False):
         self._base_url = base_url
         self._api_key = api_key
         self._logger = Logger().get_logger(__name__) if logger is None else logger
+        self._pool_maxsize = pool_maxsize
+        self._http2 = http2
+
+    def get_session(self):
+        """Get the shared session, multiplexed over HTTP/2 if enabled"""
+        return SessionPool.get_session(
+            pool_maxsize=self._pool_maxsize, http2=self._http2
+        )
 
     def create_document(self, content, metadata):
         headers = {
@@ -46,8 +54,8 @@ class Tyran(object):
 
         self._logger.info("Create a new document in tyran service API")
 
-        return requests.post(
-            f"{self._base_url}/api/v1/document", json=data, headers=headers
+        return self.get_session().request(
+            "POST", f"{self._base_url}/api/v1/document", json=data, headers=headers
         )
 
     def get_document(self, uuid):
@@ -59,7 +67,9 @@ class Tyran(object):
 
         self._logger.info(f"Fetch document with id {uuid} from tyran service API")
 
-        return requests.get(f"{self._base_url}/api/v1/document/{uuid}", headers=headers)
+        return self.get_session().request(
+            "GET", f"{self._base_url}/api/v1/document/{uuid}", headers=headers
+        )
 
     def delete_document(self, uuid):
         headers = {
@@ -70,8 +80,8 @@ class Tyran(object):
 
         self._logger.info(f"Delete document with id {uuid} from tyran service API")
 
-        return requests.delete(
-            f"{self._base_url}/api/v1/document/{uuid}", headers=headers
+        return self.get_session().request(
+            "DELETE", f"{self._base_url}/api/v1/document/{uuid}", headers=headers
         )
 
     def search_documents(self, text, metadata, limit):
@@ -85,6 +95,9 @@ class Tyran(object):
 
         self._logger.info("Search documents in tyran service API")
 
-        return requests.post(
-            f"{self._base_url}/api/v1/document/search", json=data, headers=headers
+        return self.get_session().request(
+            "POST",
+            f"{self._base_url}/api/v1/document/search",
+            json=data,
+            headers=headers,
         )
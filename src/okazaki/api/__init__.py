@@ -24,8 +24,24 @@ from .app import App
 from .label import Label
 from .issue import Issue
 from .client import Client
+from .async_client import AsyncClient
 from .pull_request import PullRequest
 from .repository import Repository
 from .statistics import Statistics
 from .milestone import Milestone
 from .webhook import Webhook
+from .session import SessionPool
+from .session import Http2Session
+from .cache import ResponseCache
+from .disk_cache import DiskCache
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy
+from .paginator import Paginator
+from .token_manager import TokenManager
+from .graphql import MutationBatch
+from .graphql import AsyncMutationBatch
+from .metrics import Metrics
+from .single_flight import SingleFlight
+from .issue_batch import IssueBatch
+from .issue_store import IssueStore
+from .label_store import LabelStore
@@ -23,11 +23,15 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import threading
+import time
 from github import Auth
 from github import Github
 from okazaki.util import Logger
 from okazaki.util import FileSystem
 from okazaki.api.client import Client
+from okazaki.api.session import PooledConnection
+from okazaki.api.token_manager import TokenManagerAuth
 
 
 class App(Client):
@@ -36,6 +40,10 @@ class App(Client):
     GitHub App authentication.
     """
 
+    # Lazy repository handles only hold metadata that was read through them
+    REPO_TTL = 300
+    LABELS_TTL = 300
+
     def __init__(
         self,
         app_id,
@@ -44,37 +52,88 @@ class App(Client):
         token_permission,
         file_system=None,
         logger=None,
+        token_manager=None,
+        **kwargs,
     ):
         """
         Initializes the App class with the given parameters.
+
+        When a TokenManager is given, the PyGithub client authenticates with the
+        installation token it caches instead of minting one of its own.
+
+        Extra keyword arguments are passed to the Client, for example the
+        connection pool settings, a RateLimiter, a RetryPolicy or Metrics,
+        which then also apply to the requests made through the PyGithub client.
         """
-        super().__init__(file_system, logger)
+        super().__init__(file_system, logger, **kwargs)
         self._app_id = app_id
         self._private_key_path = private_key_path
         self._installation_id = installation_id
         self._token_permission = token_permission
+        self._token_manager = token_manager
+        self._auth = None
+        self._repos = {}
+        self._repos_lock = threading.Lock()
+        self._labels = {}
+        self._labels_lock = threading.Lock()
         self._logger = Logger().get_logger(__name__) if logger is None else logger
         self._file_system = FileSystem() if file_system is None else file_system
 
     def init(self):
         """
         Initializes the GitHub client using the GitHub App authentication.
-        Reads the private key from the specified file path and creates an
-        authenticated GitHub client.
+        Uses the token manager when one is set, otherwise reads the private key
+        from the specified file path, reusing the cached copy while the file is
+        unchanged, and creates an authenticated GitHub client.
         """
-        private_key = self._file_system.read_file(self._private_key_path)
-
         self._logger.info(
             "Create a new client for app with id {} and installation with id {}".format(
                 self._app_id, self._installation_id
             )
         )
 
-        auth = Auth.AppAuth(self._app_id, private_key).get_installation_auth(
-            self._installation_id, self._token_permission
+        if self._token_manager is not None:
+            auth = TokenManagerAuth(self._token_manager, self._installation_id)
+        else:
+            private_key = self._get_private_key_pem(self._private_key_path)
+
+            auth = Auth.AppAuth(self._app_id, private_key).get_installation_auth(
+                self._installation_id, self._token_permission
+            )
+
+        self._auth = auth
+        self.invalidate_repo()
+        self.invalidate_labels()
+        self._client = Github(auth=auth, retry=self._retry.to_urllib3())
+        self._use_pooled_connection(self._client)
+
+    def get_permissions(self):
+        """
+        Returns the permissions granted to the installation token.
+        """
+        return self._token_permission
+
+    def get_auth_headers(self):
+        """
+        Returns the request headers authenticated as the installation.
+        """
+        return self._get_headers(self._auth.token)
+
+    def graphql(self, query, variables={}, headers=None):
+        """
+        Sends a GraphQL document authenticated as the installation.
+        """
+        return super().graphql(
+            query, variables, self.get_auth_headers() if headers is None else headers
         )
 
-        self._client = Github(auth=auth)
+    def create_mutation_batch(self, headers=None, max_cost=50):
+        """
+        Creates a mutation batch authenticated as the installation.
+        """
+        return super().create_mutation_batch(
+            self.get_auth_headers() if headers is None else headers, max_cost
+        )
 
     def get_client(self):
         """
@@ -82,6 +141,113 @@ class App(Client):
         """
         return self._client
 
+    def get_repo(self, repo):
+        """
+        Returns a lazy repository object, which only fetches the repository
+        metadata once an attribute that needs it is read. Handles are reused
+        for REPO_TTL seconds so that metadata is fetched at most once per TTL.
+        """
+        now = time.monotonic()
+
+        with self._repos_lock:
+            entry = self._repos.get(repo)
+
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+            handle = self._client.get_repo(repo, lazy=True)
+            self._repos[repo] = (now + self.REPO_TTL, handle)
+
+            return handle
+
+    def invalidate_repo(self, repo=None):
+        """
+        Drops the cached handle of a repository, or of all repositories.
+        """
+        with self._repos_lock:
+            if repo is None:
+                self._repos = {}
+            else:
+                self._repos.pop(repo, None)
+
+    def get_labels(self, repo):
+        """
+        Returns the labels of a repository keyed by their lower case name, from
+        one listing reused for LABELS_TTL seconds or until a label changes.
+        """
+        now = time.monotonic()
+
+        with self._labels_lock:
+            entry = self._labels.get(repo)
+
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        labels = self.coalesce(
+            "labels:{}".format(repo),
+            lambda: {
+                label.name.lower(): label for label in self.get_repo(repo).get_labels()
+            },
+        )
+
+        with self._labels_lock:
+            self._labels[repo] = (now + self.LABELS_TTL, labels)
+
+        return labels
+
+    def invalidate_labels(self, repo=None):
+        """
+        Drops the cached labels of a repository, or of all repositories.
+        """
+        with self._labels_lock:
+            if repo is None:
+                self._labels = {}
+            else:
+                self._labels.pop(repo, None)
+
+    def coalesce(self, key, fn):
+        """
+        Runs the function once for all concurrent callers of this installation
+        using the same key, when the App has a SingleFlight. The result is handed
+        to every caller as is, so callers must copy it before changing it.
+        """
+        if self._single_flight is None:
+            return fn()
+
+        result, _ = self._single_flight.do(
+            "installation:{}|{}".format(self._installation_id, key), fn
+        )
+
+        return result
+
+    def _get_scope(self, headers):
+        """
+        Requests made with the installation token share the scope of the PyGithub
+        client, so cache entries and rate limit budgets outlive token rotation.
+        """
+        if self._auth is not None and headers.get(
+            "Authorization"
+        ) == "Bearer {}".format(self._auth.token):
+            return "installation:{}".format(self._installation_id)
+
+        return super()._get_scope(headers)
+
+    def _use_pooled_connection(self, client):
+        """
+        Makes the PyGithub requester send its requests through the shared pool.
+        """
+        # PyGithub creates its connection lazily from this attribute
+        client.requester._Requester__connectionClass = PooledConnection.bind(
+            pool_connections=self._pool_connections,
+            pool_maxsize=self._pool_maxsize,
+            pool_block=self._pool_block,
+            keep_alive=self._keep_alive,
+            rate_limiter=self._rate_limiter,
+            scope="installation:{}".format(self._installation_id),
+            metrics=self._metrics,
+            installation=self._installation_id,
+        )
+
     def get_logger(self):
         """
         Returns the logger instance.
@@ -0,0 +1,217 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import httpx
+from requests.utils import parse_header_links
+from okazaki.api.client import Client
+from okazaki.api.graphql import AsyncMutationBatch
+
+
+class AsyncClient(Client):
+    """
+    The AsyncClient class is the asyncio counterpart of the Client. It exposes
+    the same helpers as coroutines and keeps at most `max_concurrency` requests
+    in flight at once. Transient failures are retried according to the
+    RetryPolicy. The response cache, rate limiter, metrics and single flight
+    of the Client are not supported.
+    """
+
+    def __init__(
+        self,
+        file_system=None,
+        logger=None,
+        github_api="https://api.github.com",
+        max_concurrency=10,
+        timeout=30,
+        http2=False,
+        retry=None,
+    ):
+        """
+        Initialize the AsyncClient.
+        """
+        super().__init__(file_system, logger, github_api, retry=retry, http2=http2)
+        self._max_concurrency = max_concurrency
+        self._timeout = timeout
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def fetch_access_token(self, private_key_path, app_id, installation_id):
+        """
+        Fetch an access token for a GitHub App installation.
+        """
+        return await self._post(
+            self._get_url(
+                "/app/installations/{}/access_tokens".format(installation_id)
+            ),
+            self._get_headers(self._get_jwt_token(private_key_path, app_id)),
+        )
+
+    def get_session(self):
+        """
+        Get the HTTP client used by all verbs, sized to the concurrency limit.
+        """
+        if self._session is None:
+            self._session = httpx.AsyncClient(
+                http2=self._http2,
+                limits=httpx.Limits(
+                    max_connections=self._max_concurrency,
+                    max_keepalive_connections=self._max_concurrency,
+                ),
+                timeout=self._timeout,
+            )
+
+        return self._session
+
+    async def graphql(self, query, variables={}, headers={}):
+        """
+        Send a GraphQL document and return the decoded response with its data
+        and errors.
+        """
+        return await self._post(
+            self._get_url("/graphql"),
+            headers,
+            self._to_json({"query": query, "variables": variables}),
+        )
+
+    def create_mutation_batch(self, headers={}, max_cost=50):
+        """
+        Create a batch that sends many GraphQL mutations in few requests, with
+        an execute to await.
+        """
+        return AsyncMutationBatch(self, headers, max_cost)
+
+    async def paginate(self, url, headers={}, items_key=None):
+        """
+        Iterate asynchronously over the items of a paginated listing, fetching
+        the pages one after another.
+        """
+        while url is not None:
+            response = await self._request("GET", url, headers)
+            data = self._decode(url, response)
+
+            for item in data[items_key] if items_key else data:
+                yield item
+
+            url = None
+
+            for link in parse_header_links(response.headers.get("Link", "")):
+                if link.get("rel") == "next":
+                    url = link.get("url")
+
+    async def close(self):
+        """
+        Close the HTTP client and its pooled connections.
+        """
+        if self._session is not None:
+            await self._session.aclose()
+            self._session = None
+
+    async def _get(self, url, headers={}, retry=None):
+        """
+        Perform a GET request to the specified URL.
+        """
+        return await self._send("GET", url, headers, retry=retry)
+
+    async def _post(self, url, headers={}, data="", retry=None):
+        """
+        Perform a POST request to the specified URL.
+        """
+        return await self._send("POST", url, headers, data, retry=retry)
+
+    async def _put(self, url, headers={}, data="", retry=None):
+        """
+        Perform a PUT request to the specified URL.
+        """
+        return await self._send("PUT", url, headers, data, retry=retry)
+
+    async def _patch(self, url, headers={}, data="", retry=None):
+        """
+        Perform a PATCH request to the specified URL.
+        """
+        return await self._send("PATCH", url, headers, data, retry=retry)
+
+    async def _delete(self, url, headers={}, retry=None):
+        """
+        Perform a DELETE request to the specified URL.
+        """
+        return await self._send("DELETE", url, headers, retry=retry)
+
+    async def _send(self, method, url, headers={}, data=None, retry=None):
+        """
+        Perform a request and convert a successful response to a Python object.
+        """
+        response = await self._request(method, url, headers, data, retry=retry)
+
+        return self._decode(url, response)
+
+    async def _request(self, method, url, headers={}, data=None, retry=None):
+        """
+        Perform a request once a concurrency slot is free and return the response.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        retry = self._retry if retry is None else retry
+        attempt = 0
+
+        while True:
+            async with self._semaphore:
+                self.logger.info("Perform a {} request to {}".format(method, url))
+
+                try:
+                    response = await self.get_session().request(
+                        method, url, headers=headers, content=data or None
+                    )
+                except httpx.TransportError as e:
+                    if not retry.can_retry(method, attempt):
+                        self._raise_error(url, e)
+
+                    response = None
+                    reason = e
+                except httpx.HTTPError as e:
+                    self._raise_error(url, e)
+
+            if response is not None:
+                if not retry.should_retry(method, response.status_code, attempt):
+                    return self._check_response(method, url, response)
+
+                reason = response.status_code
+
+            self._log_retry(method, url, attempt, reason)
+
+            await asyncio.sleep(
+                retry.get_backoff(
+                    attempt,
+                    None if response is None else response.headers.get("Retry-After"),
+                )
+            )
+            attempt += 1
@@ -0,0 +1,149 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import copy
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass
+class CacheEntry:
+    """A cached GET response with the validators needed to revalidate it."""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: Any
+
+    def get_validators(self):
+        """
+        Returns the conditional request headers for this entry.
+        """
+        headers = {}
+
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+class ResponseCache:
+    """
+    The ResponseCache class is a size-bounded, thread-safe LRU cache of GET
+    responses keyed by URL and auth scope. It can sit in front of a slower
+    backing cache, like a DiskCache, which is read on misses and written
+    through on updates.
+    """
+
+    def __init__(self, max_entries=1024, backing=None):
+        """
+        Initializes the cache.
+
+        Args:
+            max_entries (int): Maximum number of responses kept before the least
+                recently used one is evicted.
+            backing: Optional cache with the same interface used on misses.
+        """
+        self._max_entries = max_entries
+        self._backing = backing
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(url, scope):
+        """
+        Builds the cache key for a URL and the auth scope used to read it.
+        """
+        return "{}|{}".format(scope, url)
+
+    def get(self, key):
+        """
+        Returns a copy of the entry stored under the key or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+                return copy.deepcopy(entry)
+
+        if self._backing is None:
+            return None
+
+        entry = self._backing.get(key)
+
+        if entry is not None:
+            self._store(key, entry)
+
+        return entry
+
+    def set(self, key, entry):
+        """
+        Stores an entry, evicting the least recently used ones when full.
+        """
+        self._store(key, entry)
+
+        if self._backing is not None:
+            self._backing.set(key, entry)
+
+    def _store(self, key, entry):
+        """
+        Stores an entry in memory only.
+        """
+        with self._lock:
+            self._entries[key] = copy.deepcopy(entry)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Removes the entry stored under the key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+        if self._backing is not None:
+            self._backing.delete(key)
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        with self._lock:
+            self._entries.clear()
+
+        if self._backing is not None:
+            self._backing.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -23,29 +23,88 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import copy
 import json
+import hashlib
+import threading
 import calendar
 import time
 import datetime
 import jwt
 import requests
+from cryptography.hazmat.primitives import serialization
 from dateutil import parser
 from http import HTTPStatus
 from okazaki.util import Logger
 from okazaki.util import FileSystem
 from okazaki.exception import ApiError
+from okazaki.api.session import SessionPool
+from okazaki.api.cache import CacheEntry
+from okazaki.api.retry import RetryPolicy
+from okazaki.api.paginator import Paginator
+from okazaki.api.graphql import MutationBatch
+from okazaki.api.metrics import Metrics
 
 
 class Client:
+    # GitHub accepts app JWTs that expire at most ten minutes in the future
+    JWT_EXPIRY = 600
+    JWT_REUSE_MARGIN = 60
+
+    _private_keys = {}
+    _jwt_tokens = {}
+    _jwt_lock = threading.Lock()
+
     def __init__(
-        self, file_system=None, logger=None, github_api="https://api.github.com"
+        self,
+        file_system=None,
+        logger=None,
+        github_api="https://api.github.com",
+        pool_connections=10,
+        pool_maxsize=10,
+        pool_block=False,
+        keep_alive=True,
+        cache=None,
+        rate_limiter=None,
+        retry=None,
+        metrics=None,
+        single_flight=None,
+        http2=False,
+        cache_scope=None,
     ):
         """
         Initialize the Client.
+
+        The pool settings select a process wide session from the SessionPool,
+        so every client created with the same settings shares its connections.
+        When a ResponseCache is given, GET requests are revalidated with ETag
+        and Last-Modified instead of being downloaded again. Entries are kept
+        per credential, so with short-lived tokens a stable cache_scope, like
+        "installation:{id}", lets them outlive token rotation and restarts.
+        When a RateLimiter is given, requests are paced per credential and rate
+        limited requests wait for the reset instead of failing. Transient
+        failures are retried according to the RetryPolicy, which each verb can
+        override per call. When Metrics are given, every request is recorded per
+        route template, verb and installation. When a SingleFlight is given,
+        concurrent identical GET requests share one network call and one decoded
+        result. With http2, requests are multiplexed over HTTP/2 connections
+        instead, which only applies to the requests sent by the Client itself.
         """
         self.github_api = github_api
         self.logger = Logger().get_logger(__name__) if logger is None else logger
         self.file_system = FileSystem() if file_system is None else file_system
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._pool_block = pool_block
+        self._keep_alive = keep_alive
+        self._http2 = http2
+        self._cache = cache
+        self._rate_limiter = rate_limiter
+        self._retry = RetryPolicy() if retry is None else retry
+        self._metrics = metrics
+        self._single_flight = single_flight
+        self._cache_scope = cache_scope
+        self._installation_id = None
 
     def fetch_access_token(self, private_key_path, app_id, installation_id):
         """
@@ -70,155 +129,260 @@ class Client:
 
         return now > expire_at_dt
 
-    def _get(self, url, headers={}):
+    def get_session(self):
         """
-        Perform a GET request to the specified URL.
+        Get the shared HTTP session used by all verbs.
         """
-        try:
-            self.logger.info("Perform a GET request to {}".format(url))
-
-            request = requests.get(url, headers=headers)
+        return SessionPool.get_session(
+            self._pool_connections,
+            self._pool_maxsize,
+            self._pool_block,
+            self._keep_alive,
+            self._http2,
+        )
 
-            if self._is_success(request.status_code):
-                self.logger.info("GET request to {} succeeded".format(url))
+    def graphql(self, query, variables={}, headers={}):
+        """
+        Send a GraphQL document and return the decoded response with its data
+        and errors.
+        """
+        return self._post(
+            self._get_url("/graphql"),
+            headers,
+            self._to_json({"query": query, "variables": variables}),
+        )
 
-                return self._to_obj(request.text)
-            else:
-                msg = "Error, while calling github api {}, response: {}".format(
-                    url, request.text
-                )
+    def create_mutation_batch(self, headers={}, max_cost=50):
+        """
+        Create a batch that sends many GraphQL mutations in few requests.
+        """
+        return MutationBatch(self, headers, max_cost)
 
-                self.logger.error(msg)
+    def paginate(self, url, headers={}, prefetch=1, items_key=None):
+        """
+        Iterate lazily over the items of a paginated listing, prefetching the
+        next pages in the background.
+        """
+        return Paginator(self, url, headers, prefetch, items_key)
 
-                raise ApiError(msg)
-        except Exception:
-            msg = "Error, while calling github api {}, response: {}".format(
-                url, request.text
-            )
+    def _get(self, url, headers={}, retry=None):
+        """
+        Perform a GET request to the specified URL.
+        """
+        if self._single_flight is None:
+            return self._fetch(url, headers, retry)
 
-            self.logger.error(msg)
+        result, shared = self._single_flight.do(
+            self._get_flight_key(url, headers),
+            lambda: self._fetch(url, headers, retry),
+        )
 
-            raise ApiError(msg)
+        # Every caller, the leader included, gets its own copy to modify, so no
+        # caller changes the result while the others are still copying it
+        return copy.deepcopy(result)
 
-    def _post(self, url, headers={}, data=""):
+    def _fetch(self, url, headers, retry):
         """
-        Perform a POST request to the specified URL.
+        Send a GET request, revalidating the cached response if there is one.
         """
-        try:
-            self.logger.info("Perform a POST request to {}".format(url))
+        if self._cache is None:
+            return self._send("GET", url, headers, retry=retry)
+        key = self._cache.get_key(
+            url,
+            (
+                self._get_scope(headers)
+                if self._cache_scope is None
+                else self._cache_scope
+            ),
+        )
+        entry = self._cache.get(key)
 
-            request = requests.post(url, headers=headers, data=data)
+        if entry is not None:
+            headers = {**headers, **entry.get_validators()}
 
-            if self._is_success(request.status_code):
-                self.logger.info("POST request to {} succeeded".format(url))
+        response = self._request(
+            "GET", url, headers, revalidate=entry is not None, retry=retry
+        )
 
-                return self._to_obj(request.text)
-            else:
-                msg = "Error, while calling github api {}, response: {}".format(
-                    url, request.text
-                )
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            return entry.body
 
-                self.logger.error(msg)
+        result = self._decode(url, response)
 
-                raise ApiError(msg)
-        except Exception:
-            msg = "Error, while calling github api {}, response: {}".format(
-                url, request.text
+        if "ETag" in response.headers or "Last-Modified" in response.headers:
+            self._cache.set(
+                key,
+                CacheEntry(
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    result,
+                ),
             )
 
-            self.logger.error(msg)
+        return result
 
-            raise ApiError(msg)
+    def _post(self, url, headers={}, data="", retry=None):
+        """
+        Perform a POST request to the specified URL.
+        """
+        return self._send("POST", url, headers, data, retry=retry)
 
-    def _put(self, url, headers={}, data=""):
+    def _put(self, url, headers={}, data="", retry=None):
         """
         Perform a PUT request to the specified URL.
         """
-        try:
-            self.logger.info("Perform a PUT request to {}".format(url))
+        return self._send("PUT", url, headers, data, retry=retry)
+
+    def _patch(self, url, headers={}, data="", retry=None):
+        """
+        Perform a PATCH request to the specified URL.
+        """
+        return self._send("PATCH", url, headers, data, retry=retry)
 
-            request = requests.put(url, headers=headers, data=data)
+    def _delete(self, url, headers={}, retry=None):
+        """
+        Perform a DELETE request to the specified URL.
+        """
+        return self._send("DELETE", url, headers, retry=retry)
 
-            if self._is_success(request.status_code):
-                self.logger.info("PUT request to {} succeeded".format(url))
+    def _send(self, method, url, headers={}, data=None, retry=None):
+        """
+        Perform a request and convert a successful response to a Python object.
+        """
+        return self._decode(url, self._request(method, url, headers, data, retry=retry))
 
-                return self._to_obj(request.text)
-            else:
-                msg = "Error, while calling github api {}, response: {}".format(
-                    url, request.text
-                )
+    def _request(
+        self, method, url, headers={}, data=None, revalidate=False, retry=None
+    ):
+        """
+        Perform a request through the shared session and return the raw response.
 
-                self.logger.error(msg)
+        With revalidate, a 304 Not Modified response is returned instead of
+        being treated as an error. The retry policy overrides the client's one
+        for this call.
+        """
+        self.logger.info("Perform a {} request to {}".format(method, url))
 
-                raise ApiError(msg)
-        except Exception:
-            msg = "Error, while calling github api {}, response: {}".format(
-                url, request.text
-            )
+        retry = self._retry if retry is None else retry
+        scope = self._get_scope(headers)
+        attempt = 0
+        waits = 0
+        start = time.perf_counter()
 
-            self.logger.error(msg)
+        try:
+            while True:
+                response = None
+
+                if self._rate_limiter is not None:
+                    self._rate_limiter.acquire(scope)
+
+                try:
+                    response = self.get_session().request(
+                        method, url, headers=headers, data=data
+                    )
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if not retry.can_retry(method, attempt):
+                        self._raise_error(url, e)
+
+                    self._log_retry(method, url, attempt, e)
+                    retry.wait(attempt)
+                    attempt += 1
+                    continue
+                except requests.RequestException as e:
+                    self._raise_error(url, e)
+
+                if self._rate_limiter is not None:
+                    limited = self._rate_limiter.update(
+                        scope, response.status_code, response.headers
+                    )
+
+                    if limited and waits < self._rate_limiter.max_waits:
+                        self.logger.info(
+                            "{} request to {} was rate limited, "
+                            "waiting for reset".format(method, url)
+                        )
+                        waits += 1
+                        continue
+
+                if not retry.should_retry(method, response.status_code, attempt):
+                    break
+
+                self._log_retry(method, url, attempt, response.status_code)
+                retry.wait(attempt, response.headers.get("Retry-After"))
+                attempt += 1
+        finally:
+            if self._metrics is not None:
+                self._record_metrics(
+                    method,
+                    url,
+                    data,
+                    response,
+                    time.perf_counter() - start,
+                    attempt + waits,
+                )
 
-            raise ApiError(msg)
+        return self._check_response(method, url, response, revalidate)
 
-    def _patch(self, url, headers={}, data=""):
+    def _record_metrics(self, method, url, data, response, latency, retries):
         """
-        Perform a PATCH request to the specified URL.
+        Record a finished request in the metrics.
         """
-        try:
-            self.logger.info("Perform a PATCH request to {}".format(url))
-
-            request = requests.patch(url, headers=headers, data=data)
+        self._metrics.record(
+            Metrics.get_route(url),
+            method,
+            "app" if self._installation_id is None else self._installation_id,
+            "error" if response is None else response.status_code,
+            latency,
+            0 if response is None else len(response.content),
+            len(data) if data else 0,
+            retries,
+            None if response is None else response.headers.get("X-RateLimit-Remaining"),
+        )
 
-            if self._is_success(request.status_code):
-                self.logger.info("PATCH request to {} succeeded".format(url))
+    def _log_retry(self, method, url, attempt, reason):
+        """
+        Log that a failed request is about to be retried.
+        """
+        self.logger.warning(
+            "{} request to {} failed with {}, retry attempt {}".format(
+                method, url, reason, attempt + 1
+            )
+        )
 
-                return self._to_obj(request.text)
-            else:
-                msg = "Error, while calling github api {}, response: {}".format(
-                    url, request.text
-                )
+    def _check_response(self, method, url, response, revalidate=False):
+        """
+        Raise an ApiError unless the response has a successful status code.
+        """
+        if revalidate and response.status_code == HTTPStatus.NOT_MODIFIED:
+            self.logger.info("{} request to {} not modified".format(method, url))
 
-                self.logger.error(msg)
+            return response
 
-                raise ApiError(msg)
-        except Exception:
-            msg = "Error, while calling github api {}, response: {}".format(
-                url, request.text
-            )
+        if not self._is_success(response.status_code):
+            self._raise_error(url, response.text)
 
-            self.logger.error(msg)
+        self.logger.info("{} request to {} succeeded".format(method, url))
 
-            raise ApiError(msg)
+        return response
 
-    def _delete(self, url, headers={}):
+    def _decode(self, url, response):
         """
-        Perform a DELETE request to the specified URL.
+        Convert the body of a response to a Python object.
         """
         try:
-            self.logger.info("Perform a DELETE request to {}".format(url))
+            return self._to_obj("{}" if response.text == "" else response.text)
+        except ValueError:
+            self._raise_error(url, response.text)
 
-            request = requests.delete(url, headers=headers)
-
-            if self._is_success(request.status_code):
-                self.logger.info("DELETE request to {} succeeded".format(url))
-
-                return self._to_obj("{}" if request.text == "" else request.text)
-            else:
-                msg = "Error, while calling github api {}, response: {}".format(
-                    url, request.text
-                )
-
-                self.logger.error(msg)
-
-                raise ApiError(msg)
-        except Exception:
-            msg = "Error, while calling github api {}, response: {}".format(
-                url, request.text
-            )
+    def _raise_error(self, url, reason):
+        """
+        Log and raise an ApiError for a failed call.
+        """
+        msg = "Error, while calling github api {}, response: {}".format(url, reason)
 
-            self.logger.error(msg)
+        self.logger.error(msg)
 
-            raise ApiError(msg)
+        raise ApiError(msg)
 
     def _is_success(self, http_code):
         """
@@ -244,6 +408,24 @@ class Client:
         """
         return "{}{}".format(self.github_api, rel_url)
 
+    def _get_scope(self, headers):
+        """
+        Get the rate limit and cache scope of a request from its credentials.
+        """
+        return hashlib.sha256(headers.get("Authorization", "").encode()).hexdigest()
+
+    def _get_flight_key(self, url, headers):
+        """
+        Get the key under which identical GET requests are coalesced.
+        """
+        others = sorted(
+            (name.lower(), value)
+            for name, value in headers.items()
+            if name.lower() != "authorization"
+        )
+
+        return "{}|{}|{}".format(self._get_scope(headers), url, others)
+
     def _get_headers(self, token):
         """
         Get the default headers for API requests, including authorization.
@@ -256,15 +438,75 @@ class Client:
     def _get_jwt_token(self, private_key_path, app_id):
         """
         Generate a JWT token for GitHub App authentication.
+
+        A signed token is reused until it is about to expire, so minting many
+        installation tokens does not pay for an RSA signature each time.
         """
-        secret_key = self.file_system.read_file(private_key_path)
+        key = self._get_private_key(private_key_path)
+        now = calendar.timegm(time.gmtime())
+
+        with Client._jwt_lock:
+            cached = Client._jwt_tokens.get((private_key_path, app_id))
 
-        return jwt.encode(
+            if (
+                cached is not None
+                and cached["key"] is key
+                and cached["exp"] - self.JWT_REUSE_MARGIN > now
+            ):
+                return cached["token"]
+
+        exp = now + self.JWT_EXPIRY
+        token = jwt.encode(
             {
-                "iat": calendar.timegm(time.gmtime()) - 60,
-                "exp": calendar.timegm(time.gmtime()) + 600,
+                "iat": now - 60,
+                "exp": exp,
                 "iss": app_id,
             },
-            secret_key,
+            key,
             algorithm="RS256",
         )
+
+        with Client._jwt_lock:
+            Client._jwt_tokens[(private_key_path, app_id)] = {
+                "key": key,
+                "token": token,
+                "exp": exp,
+            }
+
+        return token
+
+    def _get_private_key(self, private_key_path):
+        """
+        Get the parsed private key, reading it again only when the file changes.
+        """
+        return self._load_private_key(private_key_path)["key"]
+
+    def _get_private_key_pem(self, private_key_path):
+        """
+        Get the PEM text of the private key from the same cache.
+        """
+        return self._load_private_key(private_key_path)["pem"]
+
+    def _load_private_key(self, private_key_path):
+        """
+        Load the private key into the process wide cache keyed by path and mtime.
+        """
+        mtime = self.file_system.get_mtime(private_key_path)
+
+        with Client._jwt_lock:
+            cached = Client._private_keys.get(private_key_path)
+
+            if cached is not None and cached["mtime"] == mtime:
+                return cached
+
+        pem = self.file_system.read_file(private_key_path)
+        cached = {
+            "mtime": mtime,
+            "pem": pem,
+            "key": serialization.load_pem_private_key(pem.encode(), password=None),
+        }
+
+        with Client._jwt_lock:
+            Client._private_keys[private_key_path] = cached
+
+        return cached
@@ -0,0 +1,150 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import sqlite3
+import threading
+import time
+from okazaki.api.cache import CacheEntry
+
+
+class DiskCache:
+    """
+    The DiskCache class stores GET responses and their validators in a SQLite
+    file so they survive process restarts. The total size of the stored bodies
+    is bounded and the least recently used entries are evicted first.
+    """
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024):
+        """
+        Initializes the cache, creating the database file if needed.
+
+        Args:
+            path (str): The SQLite database file.
+            max_bytes (int): Maximum total size of the stored bodies.
+        """
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+                "body TEXT NOT NULL, size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at "
+                "ON responses (accessed_at)"
+            )
+
+    def get(self, key):
+        """
+        Returns the entry stored under the key or None.
+        """
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT etag, last_modified, body FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            self._db.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+
+        return CacheEntry(row[0], row[1], json.loads(row[2]))
+
+    def set(self, key, entry):
+        """
+        Stores an entry, evicting the least recently used ones over the size limit.
+        """
+        body = json.dumps(entry.body)
+
+        if len(body) > self._max_bytes:
+            return
+
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, etag, last_modified, body, size, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, entry.etag, entry.last_modified, body, len(body), time.time()),
+            )
+            self._evict()
+
+    def delete(self, key):
+        """
+        Removes the entry stored under the key.
+        """
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        """
+        Deletes the least recently used entries until the size limit is met.
+        """
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+        if total <= self._max_bytes:
+            return
+
+        rows = self._db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall()
+        evicted = []
+
+        for key, size in rows:
+            if total <= self._max_bytes:
+                break
+
+            evicted.append((key,))
+            total -= size
+
+        self._db.executemany("DELETE FROM responses WHERE key = ?", evicted)
@@ -0,0 +1,276 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from okazaki.exception import ApiError
+
+
+@dataclass
+class MutationResult:
+    """The outcome of a single mutation of a MutationBatch."""
+
+    index: int
+    mutation: str
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class MutationBatch:
+    """
+    The MutationBatch class collects GraphQL mutations and sends them as aliased
+    fields of as few requests as possible, splitting them into chunks whose
+    estimated cost stays below `max_cost`.
+    """
+
+    def __init__(self, client, headers={}, max_cost=50):
+        """
+        Initializes the MutationBatch.
+
+        Args:
+            client (Client): The client used to send the requests.
+            headers (dict): The request headers, including authorization.
+            max_cost (int): The highest estimated cost sent in one request.
+        """
+        self._client = client
+        self._headers = headers
+        self._max_cost = max_cost
+        self._operations = []
+
+    def add(self, mutation, input, selection="clientMutationId", cost=1):
+        """
+        Adds a mutation and returns its index in the results.
+
+        Args:
+            mutation (str): The mutation name, like "addComment".
+            input (dict): The mutation input object.
+            selection (str): The fields selected from the mutation payload.
+            cost (int): The estimated cost used for chunking.
+        """
+        self._operations.append(
+            {
+                "mutation": mutation,
+                "input": input,
+                "selection": selection,
+                "cost": cost,
+            }
+        )
+
+        return len(self._operations) - 1
+
+    def add_labels(self, labelable_id, label_ids):
+        """
+        Adds labels, by node id, to an issue or pull request.
+        """
+        return self.add(
+            "addLabelsToLabelable",
+            {"labelableId": labelable_id, "labelIds": list(label_ids)},
+        )
+
+    def remove_labels(self, labelable_id, label_ids):
+        """
+        Removes labels, by node id, from an issue or pull request.
+        """
+        return self.add(
+            "removeLabelsFromLabelable",
+            {"labelableId": labelable_id, "labelIds": list(label_ids)},
+        )
+
+    def add_comment(self, subject_id, body):
+        """
+        Adds a comment to an issue or pull request.
+        """
+        return self.add(
+            "addComment",
+            {"subjectId": subject_id, "body": body},
+            "commentEdge { node { id } }",
+        )
+
+    def close_issue(self, issue_id):
+        """
+        Closes an issue.
+        """
+        return self.add("closeIssue", {"issueId": issue_id}, "issue { id state }")
+
+    def reopen_issue(self, issue_id):
+        """
+        Reopens an issue.
+        """
+        return self.add("reopenIssue", {"issueId": issue_id}, "issue { id state }")
+
+    def execute(self):
+        """
+        Sends all collected mutations and returns one MutationResult per mutation,
+        in the order they were added.
+        """
+        results = []
+
+        for chunk in self._get_chunks():
+            results.extend(self._execute_chunk(chunk))
+
+        self._operations = []
+
+        return results
+
+    def _get_chunks(self):
+        """
+        Splits the operations into chunks that stay within the cost limit.
+        """
+        chunk = []
+        cost = 0
+
+        for index, operation in enumerate(self._operations):
+            if chunk and cost + operation["cost"] > self._max_cost:
+                yield chunk
+                chunk = []
+                cost = 0
+
+            chunk.append((index, operation))
+            cost += operation["cost"]
+
+        if chunk:
+            yield chunk
+
+    def _execute_chunk(self, chunk):
+        """
+        Sends one chunk and maps the response and errors back to its operations.
+        """
+        query, variables = self._build_query(chunk)
+
+        try:
+            response = self._client.graphql(query, variables, self._headers)
+        except ApiError as e:
+            return self._get_failed_results(chunk, e)
+
+        return self._get_results(chunk, response)
+
+    def _get_failed_results(self, chunk, error):
+        """
+        Fails every operation of a chunk whose request failed.
+        """
+        return [
+            MutationResult(index, operation["mutation"], error=str(error))
+            for index, operation in chunk
+        ]
+
+    def _get_results(self, chunk, response):
+        """
+        Maps the response of one chunk and its errors back to its operations.
+        """
+        data = response.get("data") or {}
+        errors = {}
+        shared_errors = []
+
+        for error in response.get("errors", []):
+            path = error.get("path") or []
+
+            if path and path[0].startswith("m"):
+                errors.setdefault(path[0], []).append(error.get("message"))
+            else:
+                shared_errors.append(error.get("message"))
+
+        results = []
+
+        for index, operation in chunk:
+            alias = "m{}".format(index)
+            messages = errors.get(alias, []) + shared_errors
+
+            if data.get(alias) is None and not messages:
+                messages = ["No data returned"]
+
+            results.append(
+                MutationResult(
+                    index,
+                    operation["mutation"],
+                    data.get(alias),
+                    "; ".join(messages) if messages else None,
+                )
+            )
+
+        return results
+
+    def _build_query(self, chunk):
+        """
+        Builds one mutation document with an aliased field per operation.
+        """
+        definitions = []
+        fields = []
+        variables = {}
+
+        for index, operation in chunk:
+            mutation = operation["mutation"]
+            input_type = mutation[0].upper() + mutation[1:] + "Input"
+
+            definitions.append("$i{}: {}!".format(index, input_type))
+            fields.append(
+                "m{0}: {1}(input: $i{0}) {{ {2} }}".format(
+                    index, mutation, operation["selection"]
+                )
+            )
+            variables["i{}".format(index)] = operation["input"]
+
+        query = "mutation({}) {{\n  {}\n}}".format(
+            ", ".join(definitions), "\n  ".join(fields)
+        )
+
+        return query, variables
+
+
+class AsyncMutationBatch(MutationBatch):
+    """
+    The AsyncMutationBatch class is the MutationBatch of the AsyncClient, whose
+    execute is a coroutine sending the chunks one after another.
+    """
+
+    async def execute(self):
+        """
+        Sends all collected mutations and returns one MutationResult per mutation,
+        in the order they were added.
+        """
+        results = []
+
+        for chunk in self._get_chunks():
+            results.extend(await self._execute_chunk(chunk))
+
+        self._operations = []
+
+        return results
+
+    async def _execute_chunk(self, chunk):
+        """
+        Sends one chunk and maps the response and errors back to its operations.
+        """
+        query, variables = self._build_query(chunk)
+
+        try:
+            response = await self._client.graphql(query, variables, self._headers)
+        except ApiError as e:
+            return self._get_failed_results(chunk, e)
+
+        return self._get_results(chunk, response)
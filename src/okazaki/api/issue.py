@@ -23,8 +23,14 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import copy
+from dateutil import parser
 from github import GithubObject
+from github import UnknownObjectException
+from github.Issue import Issue as GithubIssue
 from okazaki.exception import NotFound
+from okazaki.api.issue_batch import IssueBatch
+from okazaki.api.issue_store import IssueSnapshot
 
 
 class Issue:
@@ -40,10 +46,20 @@ class Issue:
 
     def get_issue(self, repo, number):
         """
-        Retrieves a specific issue by its number.
+        Retrieves a specific issue by its number. Concurrent callers share one
+        request but each gets its own Issue object.
         """
         try:
-            return self._get_repo(repo).get_issue(number=number)
+            repo_obj = self._get_repo(repo)
+            url = f"{repo_obj.url}/issues/{number}"
+            headers, data = self._app.coalesce(
+                "issue:{}#{}".format(repo, number),
+                lambda: repo_obj.requester.requestJsonAndCheck("GET", url),
+            )
+
+            return GithubIssue(
+                repo_obj.requester, headers, copy.deepcopy(data), completed=True
+            )
         except Exception:
             return None
 
@@ -56,6 +72,68 @@ class Issue:
         except Exception:
             return None
 
+    def iter_items(self, repo, state="open"):
+        """
+        Lists issues and pull requests in one streamed pass, yielding each with
+        its type, "issues" or "pulls", so both can be handled from one listing.
+        """
+        items = self.get_issues(repo, state)
+
+        if items is None:
+            return
+
+        for item in items:
+            yield ("issues" if item.pull_request is None else "pulls"), item
+
+    def sync_issues(self, repo, store):
+        """
+        Lists only the issues and pull requests updated since the last sync of
+        the repository and merges them into the local snapshot of the store.
+        The first sync lists every open issue. The full view is available with
+        `store.get_issues(repo)`.
+
+        Args:
+            repo (str): The repository to sync.
+            store (IssueStore): The store holding the snapshot and watermark.
+
+        Returns:
+            list: The issue objects that changed since the last sync.
+        """
+        watermark = store.get_watermark(repo)
+
+        if watermark is None:
+            items = self._get_repo(repo).get_issues(state="open")
+        else:
+            # Closed issues must be listed too so they leave the open view
+            items = self._get_repo(repo).get_issues(
+                state="all",
+                sort="updated",
+                direction="asc",
+                since=parser.isoparse(watermark),
+            )
+
+        changed = list(items)
+        snapshots = []
+
+        for item in changed:
+            updated_at = item.updated_at.isoformat()
+            snapshots.append(
+                IssueSnapshot(
+                    item.number,
+                    item.state,
+                    item.pull_request is not None,
+                    updated_at,
+                    [label.name for label in item.labels],
+                )
+            )
+            # GitHub times are compared as given, so the local clock never matters
+            watermark = max(watermark or updated_at, updated_at)
+
+        if watermark is not None:
+            store.merge(repo, snapshots, watermark)
+
+        return changed
+
     def create_issue(
         self,
         repo,
@@ -78,40 +156,32 @@ class Issue:
 
     def get_labels(self, repo, labels=[]):
         """
-        Retrieves specific labels by their names.
+        Retrieves specific labels by their names from the cached listing of
+        the repository labels. Raises NotFound naming every missing label.
         """
-        result = []
+        repo_labels = self._app.get_labels(repo)
+        missing = [label for label in labels if label.lower() not in repo_labels]
 
-        for label in labels:
-            result.append(self._get_repo(repo).get_label(label))
+        if missing:
+            raise NotFound(
+                f"Labels {', '.join(missing)} not found in repository '{repo}'."
+            )
+
+        result = [repo_labels[label.lower()] for label in labels]
 
         return result if len(result) > 0 else None
 
     def close_issue(self, repo, number):
         """
-        Closes a specific issue by its number.
+        Closes a specific issue by its number or issue object.
         """
-        issue = self.get_issue(repo, number)
-
-        if issue is not None:
-            issue.edit(state="closed")
-        else:
-            raise NotFound(
-                f"Repository '{repo}' Issue with number '{number}' not found"
-            )
+        self._mutate(repo, number, lambda issue: issue.edit(state="closed"))
 
     def reopen_issue(self, repo, number):
         """
-        Reopens a specific issue by its number.
+        Reopens a specific issue by its number or issue object.
         """
-        issue = self.get_issue(repo, number)
-
-        if issue is not None:
-            issue.edit(state="open")
-        else:
-            raise NotFound(
-                f"Repository '{repo}' Issue with number '{number}' not found"
-            )
+        self._mutate(repo, number, lambda issue: issue.edit(state="open"))
 
     def edit_issue(
         self,
@@ -125,88 +195,50 @@ class Issue:
         state=GithubObject.NotSet,
     ):
         """
-        Edits an existing issue.
+        Edits an existing issue by its number or issue object.
         """
-        issue = self.get_issue(repo, number)
-
-        if issue is not None:
-            issue.edit(
+        self._mutate(
+            repo,
+            number,
+            lambda issue: issue.edit(
                 title=title,
                 body=body,
                 assignees=assignees,
                 labels=labels,
                 milestone=milestone,
                 state=state,
-            )
-        else:
-            raise NotFound(
-                f"Repository '{repo}' Issue with number '{number}' not found"
-            )
+            ),
+        )
 
     def add_comment(self, repo, number, body):
         """
-        Adds a comment to a specific issue.
+        Adds a comment to a specific issue by its number or issue object.
         """
-        issue = self.get_issue(repo, number)
-
-        if issue is not None:
-            return issue.create_comment(body)
-        else:
-            raise NotFound(
-                f"Repository '{repo}' Issue with number '{number}' not found"
-            )
+        return self._mutate(repo, number, lambda issue: issue.create_comment(body))
 
     def get_comments(self, repo, number):
         """
-        Retrieves comments from a specific issue.
+        Retrieves comments from a specific issue by its number or issue object.
         """
-        issue = self.get_issue(repo, number)
-
-        if issue is not None:
-            return issue.get_comments()
-        else:
-            raise NotFound(
-                f"Repository '{repo}' Issue with number '{number}' not found"
-            )
+        return self._read(repo, number, lambda issue: issue.get_comments())
 
     def add_labels(self, repo, number, labels):
         """
-        Adds labels to a specific issue.
+        Adds labels to a specific issue by its number or issue object.
         """
-        issue = self.get_issue(repo, number)
-
-        if issue is not None:
-            return issue.add_to_labels(*labels)
-        else:
-            raise NotFound(
-                f"Repository '{repo}' Issue with number '{number}' not found"
-            )
+        return self._mutate(repo, number, lambda issue: issue.add_to_labels(*labels))
 
     def remove_label(self, repo, number, label):
         """
-        Removes a label from a specific issue.
+        Removes a label from a specific issue by its number or issue object.
         """
-        issue = self.get_issue(repo, number)
-
-        if issue is not None:
-            return issue.remove_from_labels(label)
-        else:
-            raise NotFound(
-                f"Repository '{repo}' Issue with number '{number}' not found"
-            )
+        return self._mutate(repo, number, lambda issue: issue.remove_from_labels(label))
 
     def get_events(self, repo, number):
         """
-        Retrieves events from a specific issue.
+        Retrieves events from a specific issue by its number or issue object.
         """
-        issue = self.get_issue(repo, number)
-
-        if issue is not None:
-            return issue.get_events()
-        else:
-            raise NotFound(
-                f"Repository '{repo}' Issue with number '{number}' not found"
-            )
+        return self._read(repo, number, lambda issue: issue.get_events())
 
     def create_milestone(
         self, repo, title, state="open", description=None, due_on=None
@@ -224,14 +256,72 @@ class Issue:
         """
         return self._get_repo(repo).get_milestones(state=state)
 
+    def create_batch(self, repo, max_workers=2):
+        """
+        Creates a batch that merges many issue mutations per issue.
+        """
+        return IssueBatch(self, repo, max_workers)
+
     def search_issues(self, query):
         """
         Searches for issues based on a query.
         """
         return self._app.get_client().search_issues(query)
 
+    def _mutate(self, repo, number, action):
+        """
+        Runs the action on the issue and turns a missing issue into NotFound.
+        """
+        try:
+            return action(self._get_issue_handle(repo, number))
+        except UnknownObjectException:
+            raise NotFound(
+                f"Repository '{repo}' Issue with number "
+                f"'{getattr(number, 'number', number)}' not found"
+            )
+
+    def _read(self, repo, number, listing):
+        """
+        Returns the paginated listing of the issue with its first page fetched,
+        so a missing issue raises NotFound here rather than during iteration.
+        """
+        try:
+            items = listing(self._get_issue_handle(repo, number))
+
+            # Indexing fetches the first page, which iteration then reuses
+            items[0]
+        except IndexError:
+            pass
+        except UnknownObjectException:
+            raise NotFound(
+                f"Repository '{repo}' Issue with number "
+                f"'{getattr(number, 'number', number)}' not found"
+            )
+
+        return items
+
+    def _get_issue_handle(self, repo, number):
+        """
+        Returns the given issue or pull request object as is, or a lazy issue
+        for the number, also given as a string, that sends mutations directly
+        without fetching the issue first.
+        """
+        if hasattr(number, "number"):
+            return number
+
+        number = int(number)
+
+        repo_obj = self._get_repo(repo)
+
+        return GithubIssue(
+            repo_obj.requester,
+            {},
+            {"url": f"{repo_obj.url}/issues/{number}"},
+            completed=False,
+        )
+
     def _get_repo(self, repo):
         """
         Helper method to get a repository object from the GitHub client.
         """
-        return self._app.get_client().get_repo(repo)
+        return self._app.get_repo(repo)
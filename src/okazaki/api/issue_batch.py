@@ -0,0 +1,223 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+from github import RateLimitExceededException
+
+
+@dataclass
+class IssueBatchResult:
+    """The outcome of the merged operations on one issue of an IssueBatch."""
+
+    number: int
+    operations: List[str] = field(default_factory=list)
+    data: Optional[Any] = None
+    error: Optional[str] = None
+    skipped: bool = False
+
+    @property
+    def ok(self):
+        return self.error is None and not self.skipped
+
+
+class IssueBatch:
+    """
+    The IssueBatch class collects label, comment, state and milestone changes
+    for many issues and merges them per issue, so that adding a label and
+    closing an issue becomes one PATCH with the final label set and state.
+    Issues are processed by a small pool of workers and the remaining issues
+    are skipped once the rate limit is exhausted.
+    """
+
+    def __init__(self, issue, repo, max_workers=2):
+        """
+        Initializes the IssueBatch.
+
+        Args:
+            issue (Issue): The issue wrapper the batch sends its requests through.
+            repo (str): The repository of the issues.
+            max_workers (int): The number of issues mutated concurrently, kept
+                low since GitHub limits concurrent writes.
+        """
+        self._issue = issue
+        self._repo = repo
+        self._max_workers = max_workers
+        self._items = {}
+
+    def add_labels(self, number, labels):
+        """
+        Adds labels to an issue given by its number or issue object.
+        """
+        item = self._get_item(number, "add_labels")
+
+        for label in labels:
+            item["labels"][label] = True
+
+        return self
+
+    def remove_label(self, number, label):
+        """
+        Removes a label from an issue given by its number or issue object.
+        """
+        self._get_item(number, "remove_label")["labels"][label] = False
+
+        return self
+
+    def add_comment(self, number, body):
+        """
+        Adds a comment to an issue given by its number or issue object.
+        """
+        self._get_item(number, "add_comment")["comments"].append(body)
+
+        return self
+
+    def close_issue(self, number):
+        """
+        Closes an issue given by its number or issue object.
+        """
+        self._get_item(number, "close_issue")["edit"]["state"] = "closed"
+
+        return self
+
+    def reopen_issue(self, number):
+        """
+        Reopens an issue given by its number or issue object.
+        """
+        self._get_item(number, "reopen_issue")["edit"]["state"] = "open"
+
+        return self
+
+    def set_milestone(self, number, milestone):
+        """
+        Sets the milestone of an issue given by its number or issue object.
+        """
+        self._get_item(number, "set_milestone")["edit"]["milestone"] = milestone
+
+        return self
+
+    def execute(self):
+        """
+        Applies the collected operations and empties the batch.
+
+        Returns:
+            list: An IssueBatchResult per issue, in the order issues were added.
+        """
+        items, self._items = list(self._items.values()), {}
+        exhausted = threading.Event()
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            return list(pool.map(lambda item: self._run(item, exhausted), items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def _get_item(self, number, operation):
+        """
+        Returns the pending operations of an issue, recording the new one.
+        """
+        if not hasattr(number, "number"):
+            number = int(number)
+
+        key = number if isinstance(number, int) else number.number
+
+        if key not in self._items:
+            self._items[key] = {
+                "issue": number,
+                "operations": [],
+                "labels": {},
+                "comments": [],
+                "edit": {},
+            }
+        elif not isinstance(number, int):
+            # Prefer the issue object, its labels let additions merge into the PATCH
+            self._items[key]["issue"] = number
+
+        self._items[key]["operations"].append(operation)
+
+        return self._items[key]
+
+    def _run(self, item, exhausted):
+        """
+        Applies the operations of one issue unless the rate limit is exhausted.
+        """
+        issue = item["issue"]
+        result = IssueBatchResult(
+            issue if isinstance(issue, int) else issue.number, item["operations"]
+        )
+
+        if exhausted.is_set():
+            result.skipped = True
+            return result
+
+        try:
+            result.data = self._apply(item)
+        except RateLimitExceededException as e:
+            exhausted.set()
+            result.error = str(e)
+        except Exception as e:
+            # Transport errors escape PyGithub unwrapped, record them per issue
+            # so the results of the issues already changed are kept
+            result.error = str(e)
+
+        return result
+
+    def _apply(self, item):
+        """
+        Sends the merged requests of one issue and returns the issue object.
+        """
+        issue = self._issue._get_issue_handle(self._repo, item["issue"])
+        labels = item["labels"]
+        edit = dict(item["edit"])
+
+        if labels and isinstance(item["issue"], int):
+            # Without the current labels the final set is unknown, so send the
+            # additions in one request and the removals one by one
+            added = [name for name, add in labels.items() if add]
+
+            if added:
+                issue.add_to_labels(*added)
+
+            for name, add in labels.items():
+                if not add:
+                    issue.remove_from_labels(name)
+        elif labels:
+            current = [label.name for label in issue.labels]
+            final = [name for name in current if labels.get(name, True)] + [
+                name for name, add in labels.items() if add and name not in current
+            ]
+
+            if final != current:
+                edit["labels"] = final
+
+        if edit:
+            issue.edit(**edit)
+
+        for body in item["comments"]:
+            issue.create_comment(body)
+
+        return issue
@@ -0,0 +1,228 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass
+class IssueSnapshot:
+    """The locally stored state of an issue or pull request."""
+
+    number: int
+    state: str
+    is_pr: bool
+    updated_at: str
+    labels: List[str] = field(default_factory=list)
+
+
+class IssueStore:
+    """
+    The IssueStore class keeps a local snapshot of the issues of repositories
+    in a SQLite file, along with the watermark up to which each repository was
+    synced, so that later syncs only list the issues updated since. It also
+    keeps a priority queue of issues ordered by the time they are next due,
+    indexed so that reading the due ones does not scan the others, with the
+    checksum of the rules the due times were computed from.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes the store, creating the database file if needed.
+
+        Args:
+            path (str): The SQLite database file.
+        """
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks ("
+                "repo TEXT PRIMARY KEY, since TEXT NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS issues ("
+                "repo TEXT NOT NULL, number INTEGER NOT NULL, state TEXT NOT NULL, "
+                "is_pr INTEGER NOT NULL, updated_at TEXT NOT NULL, "
+                "labels TEXT NOT NULL, "
+                "PRIMARY KEY (repo, number))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS due_times ("
+                "repo TEXT NOT NULL, number INTEGER NOT NULL, due_at REAL NOT NULL, "
+                "PRIMARY KEY (repo, number))"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS due_times_due_at "
+                "ON due_times (repo, due_at)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS schedules ("
+                "repo TEXT PRIMARY KEY, checksum TEXT NOT NULL)"
+            )
+
+    def get_watermark(self, repo):
+        """
+        Returns the ISO 8601 time the repository was synced up to, or None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT since FROM watermarks WHERE repo = ?", (repo,)
+            ).fetchone()
+
+        return None if row is None else row[0]
+
+    def merge(self, repo, snapshots, watermark):
+        """
+        Stores the changed issues and moves the watermark in one transaction.
+
+        Args:
+            repo (str): The repository of the issues.
+            snapshots (list): The IssueSnapshot of every changed issue.
+            watermark (str): The ISO 8601 time the repository is synced up to.
+        """
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO issues "
+                "(repo, number, state, is_pr, updated_at, labels) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        repo,
+                        snapshot.number,
+                        snapshot.state,
+                        int(snapshot.is_pr),
+                        snapshot.updated_at,
+                        json.dumps(snapshot.labels),
+                    )
+                    for snapshot in snapshots
+                ],
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO watermarks (repo, since) VALUES (?, ?)",
+                (repo, watermark),
+            )
+
+    def get_issues(self, repo, state="open"):
+        """
+        Returns the IssueSnapshot of the stored issues with the given state,
+        or of all of them when the state is "all".
+        """
+        query = (
+            "SELECT number, state, is_pr, updated_at, labels FROM issues "
+            "WHERE repo = ?"
+        )
+        params = [repo]
+
+        if state != "all":
+            query += " AND state = ?"
+            params.append(state)
+
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY number", params).fetchall()
+
+        return [
+            IssueSnapshot(row[0], row[1], bool(row[2]), row[3], json.loads(row[4]))
+            for row in rows
+        ]
+
+    def set_due(self, repo, due_times):
+        """
+        Schedules issues of a repository, replacing their previous due time.
+
+        Args:
+            repo (str): The repository of the issues.
+            due_times (list): Pairs of issue number and due time as a POSIX
+                timestamp, or None to unschedule the issue.
+        """
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO due_times (repo, number, due_at) "
+                "VALUES (?, ?, ?)",
+                [(repo, number, due) for number, due in due_times if due is not None],
+            )
+            self._db.executemany(
+                "DELETE FROM due_times WHERE repo = ? AND number = ?",
+                [(repo, number) for number, due in due_times if due is None],
+            )
+
+    def get_due(self, repo, now):
+        """
+        Returns the numbers of the issues due at the POSIX timestamp, earliest
+        first. They stay due until set_due moves or removes them.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT number FROM due_times WHERE repo = ? AND due_at <= ? "
+                "ORDER BY due_at",
+                (repo, now),
+            ).fetchall()
+
+        return [row[0] for row in rows]
+
+    def get_schedule_checksum(self, repo):
+        """
+        Returns the checksum of the rules the due times of the repository were
+        computed from, or None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT checksum FROM schedules WHERE repo = ?", (repo,)
+            ).fetchone()
+
+        return None if row is None else row[0]
+
+    def set_schedule_checksum(self, repo, checksum):
+        """
+        Records the checksum of the rules the due times were computed from.
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO schedules (repo, checksum) VALUES (?, ?)",
+                (repo, checksum),
+            )
+
+    def reset(self, repo):
+        """
+        Forgets the snapshot, watermark, due times and schedule checksum of a
+        repository.
+        """
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM issues WHERE repo = ?", (repo,))
+            self._db.execute("DELETE FROM watermarks WHERE repo = ?", (repo,))
+            self._db.execute("DELETE FROM due_times WHERE repo = ?", (repo,))
+            self._db.execute("DELETE FROM schedules WHERE repo = ?", (repo,))
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._db.close()
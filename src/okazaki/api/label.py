@@ -23,6 +23,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from http import HTTPStatus
 from github import GithubObject
 from okazaki.exception import NotFound
 
@@ -44,6 +45,31 @@ class Label:
         """
         return self._get_repo(repo).get_labels()
 
+    def get_labels_if_changed(self, repo, etag=None):
+        """
+        List the first page of labels with a single conditional request.
+
+        Returns:
+            dict: None when the listing still matches the ETag, otherwise the
+            new ETag, the labels and whether the listing fit in one page.
+        """
+        headers = self._app.get_auth_headers()
+
+        if etag is not None:
+            headers = {**headers, "If-None-Match": etag}
+
+        url = self._app._get_url(f"/repos/{repo}/labels?per_page=100")
+        response = self._app._request("GET", url, headers, revalidate=True)
+
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            return None
+
+        return {
+            "etag": response.headers.get("ETag"),
+            "labels": self._app._decode(url, response),
+            "complete": 'rel="next"' not in response.headers.get("Link", ""),
+        }
+
     def get_label(self, repo, name):
         """
         Get a specific label by name.
@@ -57,9 +83,12 @@ class Label:
         """
         Create a new label in the specified repository.
         """
-        return self._get_repo(repo).create_label(
+        label = self._get_repo(repo).create_label(
             name=name, color=color, description=description
         )
+        self._app.invalidate_labels(repo)
+
+        return label
 
     def update_label(
         self,
@@ -70,21 +99,25 @@ class Label:
         new_description=GithubObject.NotSet,
     ):
         """
-        Update an existing label.
+        Update an existing label given by its name or label object.
         """
-        label = self.get_label(repo, old_name)
+        label = (
+            self.get_label(repo, old_name) if isinstance(old_name, str) else old_name
+        )
         if label is not None:
             label.edit(name=new_name, color=new_color, description=new_description)
+            self._app.invalidate_labels(repo)
         else:
             raise NotFound(f"Label '{old_name}' not found in repository '{repo}'.")
 
     def delete_label(self, repo, name):
         """
-        Delete a label from the specified repository.
+        Delete a label given by its name or label object.
         """
-        label = self.get_label(repo, name)
+        label = self.get_label(repo, name) if isinstance(name, str) else name
         if label is not None:
             label.delete()
+            self._app.invalidate_labels(repo)
         else:
             raise NotFound(f"Label '{name}' not found in repository '{repo}'.")
 
@@ -92,4 +125,4 @@ class Label:
         """
         Helper method to get a repository object from the GitHub client.
         """
-        return self._app.get_client().get_repo(repo)
+        return self._app.get_repo(repo)
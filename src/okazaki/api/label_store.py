@@ -0,0 +1,116 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import hashlib
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class LabelState:
+    """The label set of a repository as of its last sync."""
+
+    fingerprint: str
+    checksum: str
+    etag: Optional[str] = None
+
+
+class LabelStore:
+    """
+    The LabelStore class records, per repository, a fingerprint of the label
+    set, the checksum of the configuration it was synced with and the ETag of
+    the label listing, in a SQLite file.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes the store, creating the database file if needed.
+
+        Args:
+            path (str): The SQLite database file.
+        """
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS label_states ("
+                "repo TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, "
+                "checksum TEXT NOT NULL, etag TEXT)"
+            )
+
+    @staticmethod
+    def get_fingerprint(labels):
+        """
+        Returns a digest of the name, color and description of the labels,
+        independent of their order.
+        """
+        items = sorted(
+            (label["name"], label["color"], label.get("description") or "")
+            for label in labels
+        )
+
+        return hashlib.sha256(json.dumps(items).encode()).hexdigest()
+
+    def get(self, repo):
+        """
+        Returns the LabelState of the repository or None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fingerprint, checksum, etag FROM label_states WHERE repo = ?",
+                (repo,),
+            ).fetchone()
+
+        return None if row is None else LabelState(*row)
+
+    def set(self, repo, state):
+        """
+        Records the LabelState of the repository.
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO label_states "
+                "(repo, fingerprint, checksum, etag) VALUES (?, ?, ?, ?)",
+                (repo, state.fingerprint, state.checksum, state.etag),
+            )
+
+    def delete(self, repo):
+        """
+        Forgets the LabelState of the repository.
+        """
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM label_states WHERE repo = ?", (repo,))
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,273 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import re
+import threading
+from urllib.parse import urlparse
+
+
+class _Series:
+    """The measurements of one route, verb and installation."""
+
+    def __init__(self, buckets):
+        self.statuses = {}
+        self.buckets = [0] * len(buckets)
+        self.latency_sum = 0.0
+        self.count = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.retries = 0
+
+
+class Metrics:
+    """
+    The Metrics class collects per route, verb and installation request metrics
+    and exposes them as a snapshot or in the Prometheus text format.
+    """
+
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    # Path segments followed by a free-form name rather than a fixed resource
+    NAMED_SEGMENTS = {
+        "labels": "{name}",
+        "branches": "{branch}",
+        "users": "{user}",
+        "orgs": "{org}",
+    }
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        """
+        Initializes empty metrics.
+        """
+        self._series = {}
+        self._rate_limit_remaining = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """
+        Returns the process wide metrics shared by all clients.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+
+            return cls._shared
+
+    @classmethod
+    def get_route(cls, url):
+        """
+        Converts a request URL to its route template, for example
+        /repos/{owner}/{repo}/issues/{number}.
+        """
+        segments = [s for s in urlparse(url).path.split("/") if s]
+        route = []
+        index = 0
+
+        while index < len(segments):
+            segment = segments[index]
+
+            if segment == "repos" and index + 2 < len(segments):
+                route.extend(["repos", "{owner}", "{repo}"])
+                index += 3
+                continue
+
+            if segment in ("contents", "ref", "refs"):
+                route.extend([segment, "{path}"])
+                break
+
+            route.append("{number}" if segment.isdigit() else segment)
+
+            if segment in cls.NAMED_SEGMENTS and index + 1 < len(segments):
+                route.append(cls.NAMED_SEGMENTS[segment])
+                index += 1
+
+            index += 1
+
+        return "/" + "/".join(route)
+
+    def record(
+        self,
+        route,
+        method,
+        installation,
+        status,
+        latency,
+        bytes_in=0,
+        bytes_out=0,
+        retries=0,
+        rate_limit_remaining=None,
+    ):
+        """
+        Records one request.
+
+        Args:
+            route (str): The route template.
+            method (str): The HTTP verb.
+            installation (str): The installation the request was made for.
+            status: The status code, or "error" for transport failures.
+            latency (float): Seconds spent on the request including retries.
+            bytes_in (int): Bytes received.
+            bytes_out (int): Bytes sent.
+            retries (int): Times the request was re-sent.
+            rate_limit_remaining: The X-RateLimit-Remaining header, if any.
+        """
+        key = (route, method, str(installation))
+
+        with self._lock:
+            series = self._series.get(key)
+
+            if series is None:
+                series = self._series[key] = _Series(self.BUCKETS)
+
+            status = str(status)
+            series.statuses[status] = series.statuses.get(status, 0) + 1
+            series.latency_sum += latency
+            series.count += 1
+            series.bytes_in += bytes_in
+            series.bytes_out += bytes_out
+            series.retries += retries
+
+            for index, bound in enumerate(self.BUCKETS):
+                if latency <= bound:
+                    series.buckets[index] += 1
+
+            if rate_limit_remaining is not None:
+                self._rate_limit_remaining[str(installation)] = int(
+                    rate_limit_remaining
+                )
+
+    def snapshot(self):
+        """
+        Returns a copy of all metrics as plain data.
+        """
+        with self._lock:
+            return {
+                "requests": [
+                    {
+                        "route": route,
+                        "method": method,
+                        "installation": installation,
+                        "statuses": dict(series.statuses),
+                        "count": series.count,
+                        "latency_sum": series.latency_sum,
+                        "latency_buckets": dict(zip(self.BUCKETS, series.buckets)),
+                        "bytes_in": series.bytes_in,
+                        "bytes_out": series.bytes_out,
+                        "retries": series.retries,
+                    }
+                    for (route, method, installation), series in self._series.items()
+                ],
+                "rate_limit_remaining": dict(self._rate_limit_remaining),
+            }
+
+    def to_prometheus(self, prefix="okazaki_github"):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def add_header(name, kind, description):
+            lines.append("# HELP {}_{} {}".format(prefix, name, description))
+            lines.append("# TYPE {}_{} {}".format(prefix, name, kind))
+
+        def add_sample(name, labels, value):
+            lines.append(
+                "{}_{}{{{}}} {}".format(
+                    prefix,
+                    name,
+                    ",".join('{}="{}"'.format(k, self._escape(v)) for k, v in labels),
+                    value,
+                )
+            )
+
+        add_header("requests_total", "counter", "GitHub API requests by status.")
+        for item in snapshot["requests"]:
+            for status, count in sorted(item["statuses"].items()):
+                add_sample(
+                    "requests_total", self._labels(item) + [("status", status)], count
+                )
+
+        add_header(
+            "request_duration_seconds", "histogram", "GitHub API request latency."
+        )
+        for item in snapshot["requests"]:
+            labels = self._labels(item)
+
+            for bound, count in item["latency_buckets"].items():
+                add_sample(
+                    "request_duration_seconds_bucket",
+                    labels + [("le", repr(float(bound)))],
+                    count,
+                )
+
+            add_sample(
+                "request_duration_seconds_bucket",
+                labels + [("le", "+Inf")],
+                item["count"],
+            )
+            add_sample("request_duration_seconds_sum", labels, item["latency_sum"])
+            add_sample("request_duration_seconds_count", labels, item["count"])
+
+        for name, key, description in (
+            ("received_bytes_total", "bytes_in", "Bytes received from GitHub."),
+            ("sent_bytes_total", "bytes_out", "Bytes sent to GitHub."),
+            ("retries_total", "retries", "GitHub API requests sent again."),
+        ):
+            add_header(name, "counter", description)
+            for item in snapshot["requests"]:
+                add_sample(name, self._labels(item), item[key])
+
+        add_header(
+            "rate_limit_remaining", "gauge", "Last reported remaining rate limit."
+        )
+        for installation, remaining in sorted(snapshot["rate_limit_remaining"].items()):
+            add_sample(
+                "rate_limit_remaining", [("installation", installation)], remaining
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """
+        Drops all recorded metrics.
+        """
+        with self._lock:
+            self._series = {}
+            self._rate_limit_remaining = {}
+
+    def _labels(self, item):
+        return [
+            ("route", item["route"]),
+            ("method", item["method"]),
+            ("installation", item["installation"]),
+        ]
+
+    def _escape(self, value):
+        return re.sub(r'(["\\])', r"\\\1", str(value)).replace("\n", "\\n")
@@ -55,4 +55,4 @@ class Milestone:
         """
         Helper method to get a repository object from the GitHub client.
         """
-        return self._app.get_client().get_repo(repo)
+        return self._app.get_repo(repo)
@@ -0,0 +1,135 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import queue
+import threading
+from requests.utils import parse_header_links
+
+
+class Paginator:
+    """
+    The Paginator class lazily iterates over the items of a paginated GitHub
+    listing by following `Link: rel="next"` headers. While the caller works on
+    one page, the next pages are fetched on a background thread, keeping at
+    most `prefetch` pages in memory.
+    """
+
+    _DONE = object()
+
+    def __init__(self, client, url, headers={}, prefetch=1, items_key=None):
+        """
+        Initializes the Paginator.
+
+        Args:
+            client (Client): The client used to fetch the pages.
+            url (str): The URL of the first page.
+            headers (dict): The request headers.
+            prefetch (int): Pages fetched ahead of the caller, 0 to fetch serially.
+            items_key (str): The key holding the items for listings that wrap
+                them in an object, like the search API does with "items".
+        """
+        self._client = client
+        self._url = url
+        self._headers = headers
+        self._prefetch = prefetch
+        self._items_key = items_key
+
+    def __iter__(self):
+        if self._prefetch < 1:
+            for page in self._iter_pages():
+                yield from page
+            return
+
+        pages = queue.Queue(maxsize=self._prefetch)
+        stop = threading.Event()
+
+        worker = threading.Thread(target=self._produce, args=(pages, stop), daemon=True)
+        worker.start()
+
+        try:
+            while True:
+                page = pages.get()
+
+                if page is self._DONE:
+                    return
+
+                if isinstance(page, Exception):
+                    raise page
+
+                yield from page
+        finally:
+            stop.set()
+            worker.join()
+
+    def _produce(self, pages, stop):
+        """
+        Fetches pages on the background thread until done or stopped.
+        """
+        try:
+            for page in self._iter_pages():
+                if not self._put(pages, page, stop):
+                    return
+        except Exception as e:
+            self._put(pages, e, stop)
+            return
+
+        self._put(pages, self._DONE, stop)
+
+    def _put(self, pages, item, stop):
+        """
+        Waits for room in the queue unless the consumer went away.
+        """
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def _iter_pages(self):
+        """
+        Fetches the pages one after another.
+        """
+        url = self._url
+
+        while url is not None:
+            response = self._client._request("GET", url, self._headers)
+            data = self._client._decode(url, response)
+
+            yield data[self._items_key] if self._items_key else data
+
+            url = self._get_next_url(response)
+
+    def _get_next_url(self, response):
+        """
+        Extracts the URL of the next page from the Link header.
+        """
+        for link in parse_header_links(response.headers.get("Link", "")):
+            if link.get("rel") == "next":
+                return link.get("url")
+
+        return None
@@ -46,8 +46,9 @@ class PullRequest:
         """
         Creates a new branch in the specified repository.
         """
-        source_obj = self._get_repo(repo).get_branch(source_branch)
-        return self._get_repo(repo).create_git_ref(
+        repo_obj = self._get_repo(repo)
+        source_obj = repo_obj.get_branch(source_branch)
+        return repo_obj.create_git_ref(
             ref=f"refs/heads/{new_branch}", sha=source_obj.commit.sha
         )
 
@@ -78,4 +79,4 @@ class PullRequest:
         """
         Helper method to get a repository object from the GitHub client.
         """
-        return self._app.get_client().get_repo(repo)
+        return self._app.get_repo(repo)
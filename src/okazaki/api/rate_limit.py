@@ -0,0 +1,190 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import threading
+import time
+from http import HTTPStatus
+
+
+class _Budget:
+    """The rate limit state of a single installation."""
+
+    def __init__(self, burst, now):
+        self.tokens = float(burst)
+        self.refilled_at = now
+        self.remaining = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+
+
+class RateLimiter:
+    """
+    The RateLimiter class is a thread-safe governor that paces requests with a
+    token bucket per installation and waits for the rate limit reset reported by
+    GitHub instead of letting requests fail.
+    """
+
+    # Secondary limits without hints ask clients to wait at least a minute
+    SECONDARY_LIMIT_WAIT = 60
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, rate=10.0, burst=20, min_remaining=0, max_waits=3):
+        """
+        Initializes the governor.
+
+        Args:
+            rate (float): Requests per second allowed per installation.
+            burst (int): Requests that can be sent back to back before pacing.
+            min_remaining (int): Remaining budget below which requests wait for
+                the reset time.
+            max_waits (int): How many times a single request is re-sent after
+                being rate limited.
+        """
+        self.max_waits = max_waits
+        self._rate = rate
+        self._burst = burst
+        self._min_remaining = min_remaining
+        self._budgets = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """
+        Returns the process wide governor shared by all clients and threads.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+
+            return cls._shared
+
+    def acquire(self, scope):
+        """
+        Blocks until a request may be sent for the given scope.
+        """
+        while True:
+            wait = self._reserve(scope)
+
+            if wait <= 0:
+                return
+
+            self._sleep(wait)
+
+    def update(self, scope, status_code, headers):
+        """
+        Records the rate limit headers of a response.
+
+        Returns:
+            bool: True if the response was rate limited and should be re-sent.
+        """
+        now = self._now()
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        retry_after = headers.get("Retry-After")
+
+        with self._lock:
+            budget = self._get_budget(scope, now)
+
+            if remaining is not None:
+                budget.remaining = int(remaining)
+
+            if reset is not None:
+                budget.reset_at = float(reset)
+
+            limited = status_code == HTTPStatus.TOO_MANY_REQUESTS or (
+                status_code == HTTPStatus.FORBIDDEN
+                and (retry_after is not None or remaining == "0")
+            )
+
+            if not limited:
+                return False
+
+            if retry_after is not None:
+                budget.blocked_until = now + float(retry_after)
+            elif remaining == "0" and budget.reset_at > now:
+                budget.blocked_until = budget.reset_at
+            else:
+                budget.blocked_until = now + self.SECONDARY_LIMIT_WAIT
+
+            return True
+
+    def get_remaining(self, scope):
+        """
+        Returns the last remaining budget reported for the scope or None.
+        """
+        with self._lock:
+            budget = self._budgets.get(scope)
+
+            return None if budget is None else budget.remaining
+
+    def _reserve(self, scope):
+        """
+        Takes a token for the scope or returns how long to wait for one.
+        """
+        with self._lock:
+            now = self._now()
+            budget = self._get_budget(scope, now)
+
+            if budget.blocked_until > now:
+                return budget.blocked_until - now
+
+            if budget.remaining is not None and budget.remaining <= self._min_remaining:
+                if budget.reset_at > now:
+                    return budget.reset_at - now
+
+                budget.remaining = None
+
+            budget.tokens = min(
+                self._burst,
+                budget.tokens + (now - budget.refilled_at) * self._rate,
+            )
+            budget.refilled_at = now
+
+            if budget.tokens < 1:
+                return (1 - budget.tokens) / self._rate
+
+            budget.tokens -= 1
+
+            if budget.remaining is not None:
+                budget.remaining -= 1
+
+            return 0
+
+    def _get_budget(self, scope, now):
+        """
+        Returns the budget of the scope, creating it on first use.
+        """
+        if scope not in self._budgets:
+            self._budgets[scope] = _Budget(self._burst, now)
+
+        return self._budgets[scope]
+
+    def _now(self):
+        return time.time()
+
+    def _sleep(self, seconds):
+        time.sleep(seconds)
@@ -49,4 +49,4 @@ class Repository:
         """
         Helper method to get a repository object from the GitHub client.
         """
-        return self._app.get_client().get_repo(repo)
+        return self._app.get_repo(repo)
@@ -0,0 +1,111 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import inspect
+import random
+import time
+from dataclasses import dataclass
+from typing import Tuple
+from urllib3.util.retry import Retry
+from github.GithubRetry import GithubRetry
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retry policy for transient GitHub API failures.
+
+    Idempotent verbs are retried on connection errors and on the configured
+    status codes with exponential backoff and full jitter. POST and PATCH are
+    only retried when retry_non_idempotent is set, since a request that timed
+    out may already have been applied.
+    """
+
+    IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+    max_retries: int = 3
+    backoff_factor: float = 0.5
+    max_backoff: float = 30.0
+    retry_non_idempotent: bool = False
+    status_codes: Tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    def can_retry(self, method, attempt):
+        """
+        Check if a request with the given method may be sent again.
+        """
+        if attempt >= self.max_retries:
+            return False
+
+        return method in self.IDEMPOTENT_METHODS or self.retry_non_idempotent
+
+    def should_retry(self, method, status_code, attempt):
+        """
+        Check if a response with the given status code should be retried.
+        """
+        return status_code in self.status_codes and self.can_retry(method, attempt)
+
+    def get_backoff(self, attempt, retry_after=None):
+        """
+        Get the seconds to wait before the given retry attempt.
+        """
+        backoff = random.uniform(
+            0, min(self.max_backoff, self.backoff_factor * (2**attempt))
+        )
+
+        if retry_after is not None:
+            backoff = max(backoff, float(retry_after))
+
+        return backoff
+
+    def wait(self, attempt, retry_after=None):
+        """
+        Sleep before the given retry attempt.
+        """
+        time.sleep(self.get_backoff(attempt, retry_after))
+
+    def to_urllib3(self):
+        """
+        Convert the policy to the urllib3 retry object used by PyGithub.
+        """
+        methods = set(self.IDEMPOTENT_METHODS)
+
+        if self.retry_non_idempotent:
+            methods.update(["POST", "PATCH"])
+
+        options = {
+            "total": self.max_retries,
+            "backoff_factor": self.backoff_factor,
+            "status_forcelist": list(self.status_codes),
+            "allowed_methods": frozenset(methods),
+        }
+
+        # backoff_max and backoff_jitter only exist since urllib3 2
+        parameters = inspect.signature(Retry.__init__).parameters
+
+        if "backoff_jitter" in parameters:
+            options["backoff_max"] = self.max_backoff
+            options["backoff_jitter"] = self.backoff_factor
+
+        return GithubRetry(**options)
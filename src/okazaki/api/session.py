@@ -0,0 +1,295 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import threading
+import time
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from github.Requester import HTTPSRequestsConnectionClass
+from okazaki.api.metrics import Metrics
+
+
+def _noop_auth(request):
+    """
+    Leaves the prepared request untouched.
+    """
+    return request
+
+
+def _to_requests_response(response):
+    """
+    Copies a read httpx response into a requests response.
+    """
+    result = requests.Response()
+    result.status_code = response.status_code
+    result.headers = CaseInsensitiveDict(response.headers)
+    result.url = str(response.url)
+    result.reason = response.reason_phrase
+    result.encoding = response.encoding
+    result._content = response.content
+    result._content_consumed = True
+
+    return result
+
+
+class Http2Session:
+    """
+    The Http2Session class sends requests over HTTP/2 with httpx, so concurrent
+    requests to a host are multiplexed as streams over one connection instead
+    of each taking a pooled socket. It mirrors the part of requests.Session the
+    Client uses and returns and raises the same requests types.
+    """
+
+    def __init__(self, max_connections=10, keep_alive=True, verify=True):
+        """
+        Initializes the session.
+
+        Args:
+            max_connections (int): Maximum number of connections per pool, only
+                reached when a connection runs out of concurrent streams.
+            keep_alive (bool): Whether connections are kept open between requests.
+            verify: Whether to verify TLS certificates, or a CA bundle path.
+        """
+        self._client = httpx.Client(
+            http2=True,
+            verify=verify,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections if keep_alive else 0,
+            ),
+            timeout=None,
+        )
+
+    def request(self, method, url, headers=None, data=None, **kwargs):
+        """
+        Sends a request and returns it as a requests response.
+        """
+        try:
+            response = self._client.request(
+                method, url, headers=headers, content=data, **kwargs
+            )
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(e)
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(e)
+
+        return _to_requests_response(response)
+
+    def close(self):
+        """
+        Closes the session and its connections.
+        """
+        self._client.close()
+
+
+class SessionPool:
+    """
+    The SessionPool class keeps long-lived HTTP sessions so that connections to
+    the GitHub API are reused across verbs, clients and installations.
+    """
+
+    _sessions = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_session(
+        cls,
+        pool_connections=10,
+        pool_maxsize=10,
+        pool_block=False,
+        keep_alive=True,
+        http2=False,
+    ):
+        """
+        Retrieves or creates the shared session for the given pool settings.
+
+        Args:
+            pool_connections (int): Number of per-host connection pools to cache.
+            pool_maxsize (int): Maximum number of connections kept per host.
+            pool_block (bool): Whether to block when a host has no free connection
+                instead of opening an extra one.
+            keep_alive (bool): Whether connections are kept open between requests.
+            http2 (bool): Whether to multiplex requests over HTTP/2 connections.
+
+        Returns:
+            requests.Session|Http2Session: The shared session.
+        """
+        key = (pool_connections, pool_maxsize, pool_block, keep_alive, http2)
+
+        with cls._lock:
+            if key not in cls._sessions:
+                cls._sessions[key] = cls._create_session(*key)
+
+            return cls._sessions[key]
+
+    @classmethod
+    def close_all(cls):
+        """
+        Closes all shared sessions and their pooled connections.
+        """
+        with cls._lock:
+            for session in cls._sessions.values():
+                session.close()
+
+            cls._sessions = {}
+
+    @classmethod
+    def _create_session(
+        cls, pool_connections, pool_maxsize, pool_block, keep_alive, http2
+    ):
+        """
+        Creates a new session with the pooled adapter mounted for both schemes.
+        """
+        if http2:
+            return Http2Session(pool_maxsize, keep_alive)
+
+        session = requests.Session()
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        # Authorization is always set explicitly, never fall back to .netrc
+        session.auth = _noop_auth
+
+        if not keep_alive:
+            session.headers["Connection"] = "close"
+
+        return session
+
+
+class PooledConnection(HTTPSRequestsConnectionClass):
+    """
+    A PyGithub connection class whose adapter draws sockets from the shared pool
+    of the SessionPool instead of opening a new pool per Github client. When
+    bound to a RateLimiter, requests are paced and re-sent after rate limits,
+    and when bound to Metrics, every request is recorded.
+    """
+
+    pool_connections = 10
+    pool_maxsize = 10
+    pool_block = False
+    keep_alive = True
+    rate_limiter = None
+    scope = None
+    metrics = None
+    installation = None
+
+    def __init__(self, host, port=None, strict=False, timeout=None, **kwargs):
+        """
+        Initializes the connection and attaches the shared connection pool.
+        """
+        super().__init__(host, port, strict, timeout, **kwargs)
+
+        shared = SessionPool.get_session(
+            self.pool_connections, self.pool_maxsize, self.pool_block, self.keep_alive
+        )
+
+        # Keep PyGithub's own retry settings on the adapter and only share sockets
+        self.adapter.poolmanager = shared.get_adapter("https://").poolmanager
+
+        if not self.keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    def getresponse(self):
+        """
+        Sends the prepared request, waiting for rate limit resets if needed and
+        recording it in the bound metrics.
+        """
+        start = time.perf_counter()
+        response = None
+        waits = 0
+
+        try:
+            while True:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(self.scope)
+
+                response = super().getresponse()
+
+                if self.rate_limiter is None:
+                    return response
+
+                limited = self.rate_limiter.update(
+                    self.scope, response.status, response.headers
+                )
+
+                if not limited or waits >= self.rate_limiter.max_waits:
+                    return response
+
+                waits += 1
+        finally:
+            if self.metrics is not None:
+                self._record_metrics(response, time.perf_counter() - start, waits)
+
+    def _record_metrics(self, response, latency, waits):
+        """
+        Records the request in the bound metrics.
+        """
+        retries = waits
+        bytes_in = 0
+
+        if response is not None:
+            history = getattr(
+                getattr(response.response.raw, "retries", None), "history", ()
+            )
+            retries += len(history or ())
+
+            if self.stream:
+                bytes_in = int(response.headers.get("Content-Length", 0))
+            else:
+                bytes_in = len(response.response.content)
+
+        self.metrics.record(
+            Metrics.get_route(self.url),
+            self.verb,
+            self.installation,
+            "error" if response is None else response.status,
+            latency,
+            bytes_in,
+            len(self.input) if isinstance(self.input, (str, bytes)) else 0,
+            retries,
+            None if response is None else response.headers.get("X-RateLimit-Remaining"),
+        )
+
+    def close(self):
+        """
+        Keeps the shared pool open since other clients still use it.
+        """
+        pass
+
+    @classmethod
+    def bind(cls, **attrs):
+        """
+        Creates a connection class bound to the given pool settings.
+        """
+        return type(cls.__name__, (cls,), attrs)
@@ -0,0 +1,237 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import os
+import threading
+from github import Auth
+from okazaki.util import Logger
+
+
+class TokenManager:
+    """
+    The TokenManager class caches GitHub App installation tokens, refreshes them
+    before they expire and makes sure concurrent callers share a single refresh
+    per installation.
+    """
+
+    def __init__(
+        self,
+        client,
+        private_key_path,
+        app_id,
+        drift_in_minutes=10,
+        persist_path=None,
+        refresh_interval=60,
+        logger=None,
+    ):
+        """
+        Initializes the TokenManager.
+
+        Args:
+            client (Client): The client used to mint installation tokens.
+            private_key_path (str): The path to the app private key.
+            app_id (int): The ID of the application.
+            drift_in_minutes (int): Minutes before expiry a token is refreshed.
+            persist_path (str): Optional JSON file to keep tokens across restarts.
+            refresh_interval (int): Seconds between background refresh passes.
+            logger: Logger instance for logging messages (optional).
+        """
+        self._client = client
+        self._private_key_path = private_key_path
+        self._app_id = app_id
+        self._drift_in_minutes = drift_in_minutes
+        self._persist_path = persist_path
+        self._refresh_interval = refresh_interval
+        self._logger = Logger().get_logger(__name__) if logger is None else logger
+        self._tokens = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+
+        self._load()
+
+    def get_token(self, installation_id):
+        """
+        Returns a valid access token result for the installation, minting one
+        only if no cached token is fresh enough.
+        """
+        token = self._tokens.get(self._get_key(installation_id))
+
+        if token is not None and not self._is_expiring(token, self._drift_in_minutes):
+            return token
+
+        return self.refresh(installation_id, self._drift_in_minutes)
+
+    def refresh(self, installation_id, drift_in_minutes=None):
+        """
+        Mints a new token for the installation unless another caller already
+        did so while this one waited.
+        """
+        key = self._get_key(installation_id)
+
+        with self._get_lock(key):
+            token = self._tokens.get(key)
+
+            if (
+                token is not None
+                and drift_in_minutes is not None
+                and not self._is_expiring(token, drift_in_minutes)
+            ):
+                return token
+
+            self._logger.info(
+                "Mint a new access token for installation with id {}".format(
+                    installation_id
+                )
+            )
+
+            token = self._client.fetch_access_token(
+                self._private_key_path, self._app_id, installation_id
+            )
+
+            with self._lock:
+                self._tokens[key] = token
+                self._save()
+
+            return token
+
+    def invalidate(self, installation_id):
+        """
+        Drops the cached token of the installation.
+        """
+        with self._lock:
+            self._tokens.pop(self._get_key(installation_id), None)
+            self._save()
+
+    def start(self):
+        """
+        Starts refreshing cached tokens in the background before they expire.
+        """
+        with self._lock:
+            if self._worker is not None:
+                return
+
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+
+    def stop(self):
+        """
+        Stops the background refresh.
+        """
+        with self._lock:
+            worker, self._worker = self._worker, None
+
+        if worker is not None:
+            self._stop.set()
+            worker.join()
+
+    def _run(self):
+        """
+        Refreshes tokens that would expire before the next pass.
+        """
+        # Refresh one pass early so callers never wait on an expiring token
+        drift = self._drift_in_minutes + self._refresh_interval / 60
+
+        while not self._stop.wait(self._refresh_interval):
+            with self._lock:
+                tokens = list(self._tokens.items())
+
+            for key, token in tokens:
+                if not self._is_expiring(token, drift):
+                    continue
+
+                try:
+                    self.refresh(key.split(":", 1)[1], drift)
+                except Exception as e:
+                    self._logger.error(
+                        "Failed to refresh access token {}: {}".format(key, str(e))
+                    )
+
+    def _is_expiring(self, token, drift_in_minutes):
+        return self._client.is_token_expired(token["expires_at"], drift_in_minutes)
+
+    def _get_key(self, installation_id):
+        return "{}:{}".format(self._app_id, installation_id)
+
+    def _get_lock(self, key):
+        with self._lock:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+
+            return self._locks[key]
+
+    def _load(self):
+        """
+        Loads persisted tokens, ignoring a missing or unreadable file.
+        """
+        if self._persist_path is None or not os.path.exists(self._persist_path):
+            return
+
+        try:
+            with open(self._persist_path, "r") as f:
+                self._tokens = json.load(f)
+        except (OSError, ValueError) as e:
+            self._logger.error(
+                "Failed to load access tokens from {}: {}".format(
+                    self._persist_path, str(e)
+                )
+            )
+
+    def _save(self):
+        """
+        Writes the tokens to the persist file, readable by the owner only.
+        """
+        if self._persist_path is None:
+            return
+
+        tmp_path = "{}.tmp".format(self._persist_path)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+
+        with os.fdopen(fd, "w") as f:
+            json.dump(self._tokens, f)
+
+        os.replace(tmp_path, self._persist_path)
+
+
+class TokenManagerAuth(Auth.Auth):
+    """
+    PyGithub authentication backed by the installation tokens of a TokenManager,
+    so the Github client reuses the cached token and picks up refreshed ones.
+    """
+
+    def __init__(self, token_manager, installation_id):
+        self._token_manager = token_manager
+        self._installation_id = installation_id
+
+    @property
+    def token_type(self):
+        return "token"
+
+    @property
+    def token(self):
+        return self._token_manager.get_token(self._installation_id)["token"]
@@ -23,8 +23,9 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Any
+from okazaki.util import TermMatcher
 
 
 @dataclass
@@ -52,6 +53,20 @@ class AutoTriageConfig:
     triagedLabel: str
     issues: List[AutoTriageRule]
     pulls: List[AutoTriageRule]
+    wordBoundary: bool = False
+    maxBodyLength: int = 0
+    matchers: Dict[str, TermMatcher] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    def get_matcher(self, item_type: str) -> TermMatcher:
+        """Return the compiled matcher of the "issues" or "pulls" rules."""
+        if item_type not in self.matchers:
+            self.matchers[item_type] = TermMatcher(
+                [rule.terms for rule in getattr(self, item_type)], self.wordBoundary
+            )
+
+        return self.matchers[item_type]
 
 
 @dataclass
@@ -62,6 +77,7 @@ class StaleConfig:
     issues: Dict[str, Any]
     pulls: Dict[str, Any]
     exemptLabels: List[str]
+    mode: str = "list"
 
 
 class ConfigParser:
@@ -141,13 +157,21 @@ class ConfigParser:
             AutoTriageRule(**rule) for rule in auto_triage_data.get("pulls", [])
         ]
 
-        return AutoTriageConfig(
+        config = AutoTriageConfig(
             enabled=auto_triage_data.get("enabled", False),
             triagedLabel=auto_triage_data.get("triagedLabel", "triaged"),
             issues=issues_rules,
             pulls=pulls_rules,
+            wordBoundary=auto_triage_data.get("wordBoundary", False),
+            maxBodyLength=auto_triage_data.get("maxBodyLength", 0),
         )
 
+        # Compile the terms once instead of on every item
+        config.get_matcher("issues")
+        config.get_matcher("pulls")
+
+        return config
+
     def parse_stale(self, stale_data: Dict) -> StaleConfig:
         """
         Parse the stale plugin configuration.
@@ -163,4 +187,5 @@ class ConfigParser:
             issues=stale_data.get("issues", {}),
             pulls=stale_data.get("pulls", {}),
             exemptLabels=stale_data.get("exemptLabels", []),
+            mode=stale_data.get("mode", "list"),
         )
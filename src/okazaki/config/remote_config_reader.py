@@ -44,7 +44,7 @@ class RemoteConfigReader:
         """
         Retrieves the content of the specified configuration file from the remote repository.
         """
-        repo = self._app.get_client().get_repo(self._repo)
+        repo = self._app.get_repo(self._repo)
 
         try:
             content = repo.get_contents(self._file_path)
@@ -22,15 +22,30 @@
 
 import logging
 import sys
+import threading
 from okazaki.api import Client
 from okazaki.api import App
+from okazaki.api import RateLimiter
+from okazaki.api import TokenManager
+from okazaki.api import Metrics
+from okazaki.api import ResponseCache
+from okazaki.api import DiskCache
+from okazaki.api import SingleFlight
 from okazaki.config import RemoteConfigReader
 from okazaki.config import LocalConfigReader
 from okazaki.config import ConfigParser
 from okazaki.plugins import LabelsV1Plugin
+from okazaki.plugins import LabelsV1FleetSync
+from okazaki.api import LabelStore
+from okazaki.api import IssueStore
 from okazaki.plugins import AutoTriageV1Plugin
 from okazaki.plugins import StaleV1Plugin
 
+_token_managers = {}
+_token_managers_lock = threading.Lock()
+_response_caches = {}
+_response_caches_lock = threading.Lock()
+
 
 def get_sys_logger():
     """
@@ -54,7 +69,50 @@ def get_sys_logger():
     return logger
 
 
-def get_app(app_id, installation_id, private_key_path):
+def get_token_manager(app_id, private_key_path, persist_path=None):
+    """
+    Retrieves the process wide token manager of an application, creating and
+    starting it on first use.
+
+    Args:
+        app_id (int): The ID of the application.
+        private_key_path (str): The path to the private key file.
+        persist_path (str, optional): A file to keep tokens across restarts.
+
+    Returns:
+        TokenManager: The shared TokenManager instance.
+    """
+    key = (int(app_id), private_key_path)
+
+    with _token_managers_lock:
+        if key not in _token_managers:
+            _token_managers[key] = TokenManager(
+                Client(), private_key_path, int(app_id), persist_path=persist_path
+            )
+            _token_managers[key].start()
+
+        return _token_managers[key]
+
+
+def get_response_cache(cache_path):
+    """
+    Retrieves the process wide response cache backed by a SQLite file, so the
+    ETags of earlier runs are reused after a restart.
+
+    Args:
+        cache_path (str): The path to the SQLite cache file.
+
+    Returns:
+        ResponseCache: The shared ResponseCache instance.
+    """
+    with _response_caches_lock:
+        if cache_path not in _response_caches:
+            _response_caches[cache_path] = ResponseCache(backing=DiskCache(cache_path))
+
+        return _response_caches[cache_path]
+
+
+def get_app(app_id, installation_id, private_key_path, cache_path=None):
     """
     Retrieves and initializes an App instance using the provided credentials.
 
@@ -62,18 +120,24 @@ def get_app(app_id, installation_id, private_key_path):
         app_id (int): The ID of the application.
         installation_id (int): The ID of the installation.
         private_key_path (str): The path to the private key file.
+        cache_path (str, optional): A SQLite file to cache GET responses in.
 
     Returns:
         App: An initialized App instance.
     """
-    client = Client()
-
-    result = client.fetch_access_token(
-        private_key_path, int(app_id), int(installation_id)
-    )
+    token_manager = get_token_manager(app_id, private_key_path)
+    result = token_manager.get_token(int(installation_id))
 
     app = App(
-        int(app_id), private_key_path, int(installation_id), result["permissions"]
+        int(app_id),
+        private_key_path,
+        int(installation_id),
+        result["permissions"],
+        rate_limiter=RateLimiter.shared(),
+        metrics=Metrics.shared(),
+        single_flight=SingleFlight.shared(),
+        cache=None if cache_path is None else get_response_cache(cache_path),
+        token_manager=token_manager,
     )
 
     app.init()
@@ -135,13 +199,46 @@ def run_labels_v1_plugin(app, repo_name, labels_parsed_configs, logger):
         logger (logging.Logger): The logger instance.
 
     Returns:
-        Any: The result of running the LabelsV1Plugin.
+        LabelPlan: The label changes applied by the LabelsV1Plugin.
     """
     labels_v1_plugin = LabelsV1Plugin(app, repo_name, labels_parsed_configs, logger)
 
     return labels_v1_plugin.run()
 
 
+def run_labels_v1_fleet_sync(
+    app, repo_names, labels_parsed_configs, state_path, logger, max_workers=8
+):
+    """
+    Runs the LabelsV1FleetSync across many repositories, skipping those whose
+    labels and configuration did not change since their last sync.
+
+    Args:
+        app (App): The App instance.
+        repo_names (list): The names of the repositories.
+        labels_parsed_configs (dict): The parsed configuration for the labels plugin.
+        state_path (str): A SQLite file to keep the label state of each repository.
+        logger (logging.Logger): The logger instance.
+        max_workers (int, optional): Number of repositories synchronized concurrently.
+
+    Returns:
+        list: A LabelSyncResult per repository.
+    """
+    store = LabelStore(state_path)
+
+    try:
+        return LabelsV1FleetSync(
+            app,
+            repo_names,
+            labels_parsed_configs,
+            store,
+            logger,
+            max_workers,
+        ).run()
+    finally:
+        store.close()
+
+
 def run_auto_triage_v1_plugin(app, repo_name, plugin_rules, logger):
     """
     Run the Auto Triage V1 Plugin to label issues based on predefined rules.
@@ -160,7 +257,7 @@ def run_auto_triage_v1_plugin(app, repo_name, plugin_rules, logger):
     return auto_triage_v1_plugin.run()
 
 
-def run_stale_v1_plugin(app, repo_name, stale_rules, logger):
+def run_stale_v1_plugin(app, repo_name, stale_rules, logger, store_path=None):
     """
     Run the Stale V1 Plugin for a given repository.
 
@@ -169,10 +266,18 @@ def run_stale_v1_plugin(app, repo_name, stale_rules, logger):
         repo_name (str): The name of the repository to run the plugin on.
         stale_rules (dict): A dictionary containing the stale rules configuration.
         logger (object): The logger object for logging messages.
+        store_path (str, optional): A SQLite file keeping the issue snapshot and
+            due times used by the schedule mode.
 
     Returns:
         The result of running the Stale V1 Plugin.
     """
-    stale_v1_plugin = StaleV1Plugin(app, repo_name, stale_rules, logger)
+    store = None if store_path is None else IssueStore(store_path)
+
+    try:
+        stale_v1_plugin = StaleV1Plugin(app, repo_name, stale_rules, logger, store)
 
-    return stale_v1_plugin.run()
+        return stale_v1_plugin.run()
+    finally:
+        if store is not None:
+            store.close()
@@ -25,6 +25,7 @@
 
 
 from .labels_v1 import LabelsV1Plugin
+from .labels_v1 import LabelsV1FleetSync
 from .auto_triage_v1 import AutoTriageV1Plugin
 from .stale_v1 import StaleV1Plugin
 from .auto_assign_reviewer_v1 import AutoAssignReviewerV1Plugin
@@ -43,28 +43,18 @@ class AutoTriageV1Plugin:
             self._logger.info("Auto Triage V1 Plugin is disabled. Skipping.")
             return True
 
-        self._process_items("issues")
-        self._process_items("pulls")
+        self._batch = self._issue.create_batch(self._repo_name)
+        self._labels = {}
+        self._process_items()
+        self._apply_batch()
 
         return True
 
-    def _process_items(self, item_type):
-        items = self._issue.get_issues(self._repo_name, "open")
-
-        rules = (
-            self._plugin_rules.issues
-            if item_type == "issues"
-            else self._plugin_rules.pulls
-        )
-
-        for item in items:
-            if item_type == "pulls" and item.pull_request is None:
-                continue
-            if item_type == "issues" and item.pull_request is not None:
-                continue
-
-            item_title = item.title.lower()
-            item_body = item.body.lower()
+    def _process_items(self):
+        for item_type, item in self._issue.iter_items(self._repo_name, "open"):
+            rules = getattr(self._plugin_rules, item_type)
+            matcher = self._plugin_rules.get_matcher(item_type)
+            item_body = item.body or ""
             item_number = item.number
             item_labels = [label.name for label in item.labels]
 
@@ -72,25 +62,28 @@ class AutoTriageV1Plugin:
             if self._plugin_rules.triagedLabel in item_labels:
                 continue
 
-            labels_to_add = []
+            if self._plugin_rules.maxBodyLength:
+                item_body = item_body[: self._plugin_rules.maxBodyLength]
 
-            for rule in rules:
-                if any(
-                    term.lower() in item_title or term.lower() in item_body
-                    for term in rule.terms
-                ):
-                    labels_to_add.append(rule.label)
+            labels_to_add = [
+                rules[index].label for index in matcher.match(item.title, item_body)
+            ]
 
             if labels_to_add:
                 labels_to_add.append(self._plugin_rules.triagedLabel)
 
-                try:
-                    self._issue.add_labels(self._repo_name, item_number, labels_to_add)
-
-                    self._logger.info(
-                        f"Added labels {labels_to_add} to {item_type[:-1]} #{item_number} in repository {self._repo_name}"
-                    )
-                except Exception as e:
-                    self._logger.error(
-                        f"Failed to add labels {labels_to_add} to {item_type[:-1]} #{item_number} in repository {self._repo_name}: {str(e)}"
-                    )
+                self._batch.add_labels(item, labels_to_add)
+                self._labels[item_number] = (item_type[:-1], labels_to_add)
+
+    def _apply_batch(self):
+        for result in self._batch.execute():
+            item_type, labels_to_add = self._labels[result.number]
+
+            if result.ok:
+                self._logger.info(
+                    f"Added labels {labels_to_add} to {item_type} #{result.number} in repository {self._repo_name}"
+                )
+            else:
+                self._logger.error(
+                    f"Failed to add labels {labels_to_add} to {item_type} #{result.number} in repository {self._repo_name}: {result.error or 'rate limit exhausted'}"
+                )
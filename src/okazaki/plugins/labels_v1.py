@@ -23,14 +23,32 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, List, Optional, Tuple
 from okazaki.api import Label
+from okazaki.api import LabelStore
+from okazaki.api.label_store import LabelState
 from okazaki.util import Logger
 
 
+@dataclass
+class LabelPlan:
+    """The changes that bring the labels of a repository in line with the config."""
+
+    create: List[Any] = field(default_factory=list)
+    update: List[Tuple[Any, Any]] = field(default_factory=list)
+    delete: List[Any] = field(default_factory=list)
+
+    @property
+    def empty(self):
+        return not (self.create or self.update or self.delete)
+
+
 class LabelsV1Plugin:
     """A plugin for synchronizing labels in a repository."""
 
-    def __init__(self, app, repo_name, cfg_labels, logger=None):
+    def __init__(self, app, repo_name, cfg_labels, logger=None, max_workers=2):
         """
         Initialize the LabelsV1Plugin.
 
@@ -39,63 +57,225 @@ class LabelsV1Plugin:
             repo_name: The name of the repository.
             cfg_labels: Configuration labels to sync with the repository.
             logger: Logger instance for logging messages (optional).
+            max_workers: Number of label changes applied concurrently.
         """
         self._app = app
         self._label = Label(app)
         self._repo_name = repo_name
         self._cfg_labels = cfg_labels
+        self._max_workers = max_workers
         self._logger = Logger().get_logger(__name__) if logger is None else logger
 
     def run(self):
-        """Execute the plugin to synchronize labels with the repository."""
-        gh_labels = self._label.get_labels(self._repo_name)
-        gh_label_names = {label.name: label for label in gh_labels}
+        """Execute the plugin to synchronize labels with the repository.
 
+        Returns:
+            LabelPlan: The changes that were applied.
+        """
         self._logger.info(f"Start labels sync for repository {self._repo_name}")
 
-        # Synchronize labels based on configuration
-        for cfg_label in self._cfg_labels:
-            if cfg_label.name in gh_label_names:
-                # Update existing label properties if necessary
-                gh_label = gh_label_names[cfg_label.name]
-
-                if (
-                    gh_label.color != cfg_label.color
-                    or gh_label.description != cfg_label.description
-                ):
-                    self._logger.info(
-                        f"Updating existing label {cfg_label.name} in repository {self._repo_name}"
-                    )
-
-                    self._label.update_label(
-                        self._repo_name,
-                        cfg_label.name,
-                        cfg_label.name,
-                        cfg_label.color,
-                        cfg_label.description,
-                    )
-            else:
-                # Create new label if it doesn't exist
-                self._logger.info(
-                    f"Creating new label {cfg_label.name} in repository {self._repo_name}"
-                )
-
-                self._label.create_label(
-                    self._repo_name,
-                    cfg_label.name,
-                    cfg_label.color,
-                    cfg_label.description,
-                )
-
-        # Remove labels that are not in the configuration
-        for gh_label in gh_labels:
-            if gh_label.name not in (cfg_label.name for cfg_label in self._cfg_labels):
-                self._logger.info(
-                    f"Deleting label {gh_label.name} from repository {self._repo_name}"
-                )
-
-                self._label.delete_label(self._repo_name, gh_label.name)
+        plan = self.plan(self._label.get_labels(self._repo_name))
+        self.apply(plan)
 
         self._logger.info(f"Finished labels sync for repository {self._repo_name}")
 
-        return True
+        return plan
+
+    def plan(self, gh_labels):
+        """Compute the labels to create, update and delete.
+
+        Args:
+            gh_labels: The labels currently in the repository.
+
+        Returns:
+            LabelPlan: The configuration labels to create, the repository and
+            configuration label pairs to update and the repository labels to delete.
+        """
+        plan = LabelPlan()
+        gh_label_names = {label.name: label for label in gh_labels}
+        cfg_label_names = {label.name for label in self._cfg_labels}
+
+        for cfg_label in self._cfg_labels:
+            gh_label = gh_label_names.get(cfg_label.name)
+
+            if gh_label is None:
+                plan.create.append(cfg_label)
+            elif (
+                gh_label.color != cfg_label.color
+                or gh_label.description != cfg_label.description
+            ):
+                plan.update.append((gh_label, cfg_label))
+
+        plan.delete = [
+            gh_label
+            for name, gh_label in gh_label_names.items()
+            if name not in cfg_label_names
+        ]
+
+        return plan
+
+    def apply(self, plan):
+        """Apply a plan on a bounded pool of workers.
+
+        The label objects held by the plan are changed directly, so nothing is
+        fetched again. The first error is raised once all changes were tried.
+
+        Args:
+            plan: The LabelPlan to apply.
+        """
+        changes = (
+            [(self._create, cfg_label) for cfg_label in plan.create]
+            + [(self._update, pair) for pair in plan.update]
+            + [(self._delete, gh_label) for gh_label in plan.delete]
+        )
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            futures = [pool.submit(change, arg) for change, arg in changes]
+
+        for future in futures:
+            future.result()
+
+    def _create(self, cfg_label):
+        """Create a configuration label in the repository."""
+        self._logger.info(
+            f"Creating new label {cfg_label.name} in repository {self._repo_name}"
+        )
+
+        self._label.create_label(
+            self._repo_name,
+            cfg_label.name,
+            cfg_label.color,
+            cfg_label.description,
+        )
+
+    def _update(self, pair):
+        """Update a repository label to match its configuration."""
+        gh_label, cfg_label = pair
+
+        self._logger.info(
+            f"Updating existing label {cfg_label.name} in repository {self._repo_name}"
+        )
+
+        self._label.update_label(
+            self._repo_name,
+            gh_label,
+            cfg_label.name,
+            cfg_label.color,
+            cfg_label.description,
+        )
+
+    def _delete(self, gh_label):
+        """Delete a repository label missing from the configuration."""
+        self._logger.info(
+            f"Deleting label {gh_label.name} from repository {self._repo_name}"
+        )
+
+        self._label.delete_label(self._repo_name, gh_label)
+
+
+@dataclass
+class LabelSyncResult:
+    """The outcome of the label sync of one repository of a fleet."""
+
+    repo: str
+    plan: Optional[LabelPlan] = None
+    skipped: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class LabelsV1FleetSync:
+    """A plugin for synchronizing one label configuration across many repositories.
+
+    Each repository costs one conditional request when neither its labels nor
+    the configuration changed since its last sync, as recorded in a LabelStore.
+    """
+
+    def __init__(self, app, repo_names, cfg_labels, store, logger=None, max_workers=8):
+        """
+        Initialize the LabelsV1FleetSync.
+
+        Args:
+            app: The application context.
+            repo_names: The names of the repositories.
+            cfg_labels: Configuration labels to sync with the repositories.
+            store: The LabelStore keeping the state of the last syncs.
+            logger: Logger instance for logging messages (optional).
+            max_workers: Number of repositories synchronized concurrently.
+        """
+        self._app = app
+        self._label = Label(app)
+        self._repo_names = repo_names
+        self._cfg_labels = cfg_labels
+        # Only the label definitions matter, other configuration changes keep
+        # the recorded state current
+        self._checksum = LabelStore.get_fingerprint(
+            [asdict(label) for label in cfg_labels]
+        )
+        self._store = store
+        self._max_workers = max_workers
+        self._logger = Logger().get_logger(__name__) if logger is None else logger
+
+    def run(self):
+        """Synchronize the labels of every repository.
+
+        Returns:
+            list: A LabelSyncResult per repository, in the given order.
+        """
+        self._logger.info(f"Start labels sync for {len(self._repo_names)} repositories")
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            results = list(pool.map(self._sync, self._repo_names))
+
+        self._logger.info(
+            f"Finished labels sync, {sum(result.skipped for result in results)} "
+            f"repositories unchanged, {sum(not result.ok for result in results)} failed"
+        )
+
+        return results
+
+    def _sync(self, repo):
+        """Synchronize one repository unless it is unchanged since its last sync."""
+        try:
+            state = self._store.get(repo)
+            current = state is not None and state.checksum == self._checksum
+            listing = self._label.get_labels_if_changed(
+                repo, state.etag if current else None
+            )
+
+            if listing is None:
+                return LabelSyncResult(repo, skipped=True)
+
+            fingerprint = LabelStore.get_fingerprint(listing["labels"])
+
+            if current and listing["complete"] and fingerprint == state.fingerprint:
+                self._save(repo, listing, fingerprint)
+                return LabelSyncResult(repo, skipped=True)
+
+            plan = LabelsV1Plugin(self._app, repo, self._cfg_labels, self._logger).run()
+
+            if not plan.empty:
+                listing = self._label.get_labels_if_changed(repo)
+                fingerprint = LabelStore.get_fingerprint(listing["labels"])
+
+            self._save(repo, listing, fingerprint)
+
+            return LabelSyncResult(repo, plan)
+        except Exception as e:
+            self._logger.error(f"Failed to sync labels of repository {repo}: {str(e)}")
+
+            return LabelSyncResult(repo, error=str(e))
+
+    def _save(self, repo, listing, fingerprint):
+        """Record the synced state, keeping the ETag only if it covers every label."""
+        self._store.set(
+            repo,
+            LabelState(
+                fingerprint,
+                self._checksum,
+                listing["etag"] if listing["complete"] else None,
+            ),
+        )
@@ -23,16 +23,18 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import hashlib
+import json
 from okazaki.api import Issue
 from okazaki.util import Logger
-from datetime import datetime
+from datetime import datetime, timedelta
 from dateutil.tz import tzutc
 
 
 class StaleV1Plugin:
     """A plugin to manage stale issues and pull requests in a repository."""
 
-    def __init__(self, app, repo_name, stale_rules, logger):
+    def __init__(self, app, repo_name, stale_rules, logger, store=None):
         """
         Initialize the StaleV1Plugin.
 
@@ -41,11 +43,13 @@ class StaleV1Plugin:
             repo_name: The name of the repository.
             stale_rules: Rules defining how to handle stale items.
             logger: Logger instance for logging messages (optional).
+            store: IssueStore keeping the due times, needed by the schedule mode.
         """
         self._app = app
         self._issue = Issue(app)
         self._repo_name = repo_name
         self._stale_rules = stale_rules
+        self._store = store
         self._logger = Logger().get_logger(__name__) if logger is None else logger
 
     def run(self):
@@ -56,26 +60,159 @@ class StaleV1Plugin:
             self._logger.info("Stale rules are not enabled. Skipping.")
             return
 
-        self._process_issues()
-        self._process_pull_requests()
+        self._batch = self._issue.create_batch(self._repo_name)
+        due_items = []
 
-    def _process_issues(self):
-        """Process open issues in the repository."""
-        issues = self._issue.get_issues(self._repo_name, state="open")
+        if self._stale_rules.mode == "schedule" and self._store is None:
+            self._logger.warning("Schedule mode needs an issue store, listing instead")
 
-        for issue in issues:
-            # Only process if it's not a pull request
-            if issue.pull_request is None:
-                self._process_item(issue, self._stale_rules.issues)
+        if self._stale_rules.mode == "search":
+            self._search_items("issue", self._stale_rules.issues)
+            self._search_items("pr", self._stale_rules.pulls)
+        elif self._stale_rules.mode == "schedule" and self._store is not None:
+            due_items = self._process_due_items()
+        else:
+            self._process_items()
 
-    def _process_pull_requests(self):
-        """Process open pull requests in the repository."""
-        pulls = self._issue.get_issues(self._repo_name, state="open")
+        self._apply_batch()
 
-        for pull in pulls:
-            # Only process if it is a pull request
-            if pull.pull_request is not None:
-                self._process_item(pull, self._stale_rules.pulls)
+        # Due items stay due until rescheduled here, once their changes are
+        # applied, so a failed run leaves them for the next one
+        if due_items:
+            self._schedule(due_items)
+
+    def _process_items(self):
+        """Process open issues and pull requests in one pass over the repository."""
+        for item_type, item in self._issue.iter_items(self._repo_name, "open"):
+            self._process_item(item, getattr(self._stale_rules, item_type))
+
+    def _process_due_items(self):
+        """Process only the items whose next transition is due.
+
+        The items updated since the last run are synced into the store and
+        scheduled by the time they become stale or closable, then the due
+        items are checked against the rules again. Items that cannot be
+        fetched stay due. When the rules changed since the due times were
+        computed, the repository is synced and scheduled again from scratch.
+
+        Returns:
+            list: The due items to reschedule once the batch is applied.
+        """
+        now = datetime.now(tzutc())
+        checksum = self._get_rules_checksum()
+
+        if self._store.get_schedule_checksum(self._repo_name) != checksum:
+            self._logger.info("Stale rules changed, rescheduling all items")
+            self._store.reset(self._repo_name)
+
+        changed = {
+            item.number: item
+            for item in self._issue.sync_issues(self._repo_name, self._store)
+        }
+        self._schedule(changed.values())
+        self._store.set_schedule_checksum(self._repo_name, checksum)
+        due_items = []
+
+        for number in self._store.get_due(self._repo_name, now.timestamp()):
+            item = changed.get(number) or self._issue.get_issue(self._repo_name, number)
+
+            if item is None:
+                continue
+
+            if item.state == "open":
+                self._process_item(item, self._get_rules(item))
+
+            due_items.append(item)
+
+        return due_items
+
+    def _schedule(self, items):
+        """Store the time the next transition of each item is due.
+
+        Args:
+            items: The issues and pull requests to schedule.
+        """
+        self._store.set_due(
+            self._repo_name, [(item.number, self._get_due_time(item)) for item in items]
+        )
+
+    def _get_rules_checksum(self):
+        """Return a digest of the rules the due times are computed from."""
+        rules = [
+            self._stale_rules.issues,
+            self._stale_rules.pulls,
+            sorted(self._stale_rules.exemptLabels),
+        ]
+
+        return hashlib.sha256(json.dumps(rules, sort_keys=True).encode()).hexdigest()
+
+    def _get_due_time(self, item):
+        """Compute when an item becomes stale, or closable once it is stale.
+
+        Args:
+            item: The issue or pull request to schedule.
+
+        Returns:
+            float: The POSIX timestamp of the transition, or None if there is none.
+        """
+        if item.state != "open" or self._is_exempt(item):
+            return None
+
+        rules = self._get_rules(item)
+        days = rules["daysUntilStale"]
+
+        if self._has_stale_label(item, rules):
+            days += rules["daysUntilClose"]
+
+        return (item.updated_at + timedelta(days=days)).timestamp()
+
+    def _get_rules(self, item):
+        """Return the rules of an issue or a pull request."""
+        if item.pull_request is None:
+            return self._stale_rules.issues
+
+        return self._stale_rules.pulls
+
+    def _search_items(self, kind, rules):
+        """Process only the items the search API reports as due.
+
+        The search API returns at most 1000 items per query, any further
+        candidates are picked up by the next run.
+
+        Args:
+            kind: The search qualifier of the items, "issue" or "pr".
+            rules: The rules to apply for determining staleness.
+        """
+        now = datetime.now(tzutc())
+
+        for query in self._get_search_queries(kind, rules, now):
+            for item in self._issue.search_issues(query):
+                # Search results are candidates, the rules still decide
+                self._process_item(item, rules)
+
+    def _get_search_queries(self, kind, rules, now):
+        """Build the queries finding items to mark and items to close.
+
+        Args:
+            kind: The search qualifier of the items, "issue" or "pr".
+            rules: The rules defining staleness.
+            now: The current timestamp.
+
+        Returns:
+            list: The query for items to mark and the query for items to close.
+        """
+        stale_cutoff = now - timedelta(days=rules["daysUntilStale"])
+        close_cutoff = stale_cutoff - timedelta(days=rules["daysUntilClose"])
+        base = f"repo:{self._repo_name} is:{kind} is:open" + "".join(
+            f' -label:"{label}"' for label in self._stale_rules.exemptLabels
+        )
+
+        return [
+            f'{base} -label:"{rules["staleLabel"]}" '
+            f"updated:<={stale_cutoff:%Y-%m-%dT%H:%M:%SZ}",
+            f'{base} label:"{rules["staleLabel"]}" '
+            f"updated:<={close_cutoff:%Y-%m-%dT%H:%M:%SZ}",
+        ]
 
     def _process_item(self, item, rules):
         """Evaluate an issue or pull request against stale rules.
@@ -161,8 +298,8 @@ class StaleV1Plugin:
             rules: The rules defining the marking process.
         """
         self._logger.info(f"Marking item #{item.number} as stale")
-        self._issue.add_labels(self._repo_name, item.number, [rules["staleLabel"]])
-        self._issue.add_comment(self._repo_name, item.number, rules["markComment"])
+        self._batch.add_labels(item, [rules["staleLabel"]])
+        self._batch.add_comment(item, rules["markComment"])
 
     def _close_item(self, item, rules):
         """Close a stale item and add a closing comment.
@@ -172,5 +309,17 @@ class StaleV1Plugin:
             rules: The rules defining the closing process.
         """
         self._logger.info(f"Closing stale item #{item.number}")
-        self._issue.close_issue(self._repo_name, item.number)
-        self._issue.add_comment(self._repo_name, item.number, rules["closeComment"])
+        self._batch.close_issue(item)
+        self._batch.add_comment(item, rules["closeComment"])
+
+    def _apply_batch(self):
+        """Apply the collected changes and log the items that failed."""
+        for result in self._batch.execute():
+            if result.skipped:
+                self._logger.warning(
+                    f"Skipped item #{result.number} since the rate limit is exhausted"
+                )
+            elif not result.ok:
+                self._logger.error(
+                    f"Failed to update stale item #{result.number}: {result.error}"
+                )
@@ -25,3 +25,4 @@
 
 from .logger import Logger
 from .file_system import FileSystem
+from .term_matcher import TermMatcher
@@ -23,6 +23,8 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import os
+
 
 class FileSystem:
     """
@@ -36,3 +38,10 @@ class FileSystem:
         """
         with open(file_path, "r") as f:
             return f.read()
+
+    @classmethod
+    def get_mtime(cls, file_path):
+        """
+        Returns the last modification time of a file.
+        """
+        return os.stat(file_path).st_mtime_ns
@@ -0,0 +1,143 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# This software is licensed under the MIT License. The full text of the license
+# is provided below.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import re
+
+
+class TermMatcher:
+    """
+    The TermMatcher class finds which rules have a term in a text with a single
+    scan. The terms of all rules are compiled into one regex shaped like a trie,
+    so each position only follows the terms sharing its first characters, and
+    whose lookahead reports at every position the longest term starting there.
+    Any shorter term matching at the same position is a prefix of it, so those
+    are looked up from a table built once instead of being searched for.
+    """
+
+    def __init__(self, rules, word_boundary=False):
+        """
+        Compiles the matcher.
+
+        Args:
+            rules (list): The term lists of the rules, each a list of strings.
+            word_boundary (bool): Whether terms only match when not directly
+                preceded or followed by a letter, digit or underscore.
+        """
+        self._word_boundary = word_boundary
+        self._rules = {}
+
+        for index, terms in enumerate(rules):
+            for term in terms:
+                if term:
+                    self._rules.setdefault(term.lower(), set()).add(index)
+
+        trie = {}
+
+        for term in self._rules:
+            node = trie
+
+            for char in term:
+                node = node.setdefault(char, {})
+
+            node[""] = {}
+
+        self._prefixes = {term: self._get_prefixes(trie, term) for term in self._rules}
+        self._pattern = None
+        self._boundary = re.compile(r"(?!\w)")
+
+        if trie:
+            alternation = self._compile_node(trie)
+
+            if word_boundary:
+                alternation = r"(?<!\w)(?:{})(?!\w)".format(alternation)
+
+            self._pattern = re.compile("(?=({}))".format(alternation))
+
+    @staticmethod
+    def _get_prefixes(trie, term):
+        """
+        Returns the terms that are a prefix of the term, itself included.
+        """
+        prefixes = []
+        node = trie
+
+        for length, char in enumerate(term, 1):
+            node = node[char]
+
+            if "" in node:
+                prefixes.append(term[:length])
+
+        return prefixes
+
+    @classmethod
+    def _compile_node(cls, node):
+        """
+        Builds the regex of a trie node, where an empty key marks a term end,
+        branching on one character at a time and preferring the longest term.
+        """
+        branches = [
+            re.escape(char) + cls._compile_node(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+
+        if not branches:
+            return ""
+
+        pattern = (
+            branches[0] if len(branches) == 1 else "(?:{})".format("|".join(branches))
+        )
+
+        # A term ending here is matched when no longer term continues
+        return "(?:{})?".format(pattern) if "" in node else pattern
+
+    def match(self, *texts):
+        """
+        Returns the indexes of the rules with a term in any of the texts, in
+        rule order. Terms match case insensitively and never across texts.
+        """
+        if self._pattern is None:
+            return []
+
+        matched = set()
+
+        for text in texts:
+            text = (text or "").lower()
+
+            for found in self._pattern.finditer(text):
+                start = found.start()
+
+                for term in self._prefixes[found.group(1)]:
+                    if term in matched:
+                        continue
+
+                    if self._word_boundary and not self._boundary.match(
+                        text, start + len(term)
+                    ):
+                        continue
+
+                    matched.add(term)
+
+        return sorted({index for term in matched for index in self._rules[term]})
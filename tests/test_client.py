@@ -26,3 +26,470 @@ import pytest
 def test_client():
     """Client Tests"""
     assert True == True
+
+
+def test_client_shares_pooled_session():
+    """Clients with the same pool settings share one session"""
+    from okazaki.api import Client
+
+    assert Client().get_session() is Client().get_session()
+    assert Client(pool_maxsize=20).get_session() is not Client().get_session()
+
+
+def test_client_http2_session_raises_requests_errors():
+    """The HTTP/2 session is shared and raises the errors the Client retries on"""
+    import socket
+    import requests
+    from okazaki.api import Client, Http2Session
+
+    session = Client(http2=True).get_session()
+
+    assert isinstance(session, Http2Session)
+    assert session is Client(http2=True).get_session()
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    with pytest.raises(requests.ConnectionError):
+        session.request("GET", "http://127.0.0.1:{}/".format(port))
+
+
+def test_http2_session_returns_requests_responses():
+    """Callers such as Tyran get requests responses from the HTTP/2 session"""
+    import httpx
+    import requests
+    from okazaki.api import Http2Session
+
+    def handler(request):
+        return httpx.Response(404, json={"message": "Not Found"})
+
+    session = Http2Session()
+    session._client = httpx.Client(transport=httpx.MockTransport(handler))
+    response = session.request("POST", "https://tyran/api/v1/document", json={})
+
+    assert isinstance(response, requests.Response)
+    assert not response.ok
+    assert response.json() == {"message": "Not Found"}
+    assert b"".join(response.iter_content(4)) == response.content
+    assert response.headers["content-type"] == "application/json"
+
+    with pytest.raises(requests.HTTPError):
+        response.raise_for_status()
+
+
+def test_async_client_bounds_concurrency():
+    """AsyncClient keeps at most max_concurrency requests in flight"""
+    import asyncio
+    import httpx
+    from okazaki.api import AsyncClient
+
+    state = {"active": 0, "peak": 0}
+
+    async def handler(request):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        return httpx.Response(200, json={"path": request.url.path})
+
+    async def run():
+        async with AsyncClient(max_concurrency=3) as client:
+            client._session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            return await asyncio.gather(
+                *[client._get(client._get_url(f"/issues/{i}")) for i in range(10)]
+            )
+
+    result = asyncio.run(run())
+
+    assert result[4] == {"path": "/issues/4"}
+    assert state["peak"] == 3
+
+
+def test_async_client_provides_async_helpers():
+    """AsyncClient helpers are coroutines instead of inherited blocking ones"""
+    import asyncio
+    import httpx
+    from okazaki.api import AsyncClient, RetryPolicy
+
+    attempts = []
+
+    async def handler(request):
+        if request.url.path == "/graphql":
+            attempts.append(request)
+
+            if len(attempts) == 1:
+                return httpx.Response(502)
+
+            if b"closeIssue" in request.content:
+                return httpx.Response(
+                    200, json={"data": {"m0": {"issue": {"id": "I_1"}}}}
+                )
+
+            return httpx.Response(200, json={"data": {"viewer": {"login": "a"}}})
+
+        if request.url.params.get("page") == "2":
+            return httpx.Response(200, json=[3])
+
+        return httpx.Response(
+            200, json=[1, 2], headers={"Link": '<https://x/items?page=2>; rel="next"'}
+        )
+
+    async def run():
+        retry = RetryPolicy(backoff_factor=0, retry_non_idempotent=True)
+
+        async with AsyncClient(retry=retry) as client:
+            client._session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            result = await client.graphql("query { viewer { login } }")
+            items = [item async for item in client.paginate("https://x/items")]
+            batch = client.create_mutation_batch()
+            batch.close_issue("I_1")
+
+            return result, items, await batch.execute()
+
+    result, items, mutations = asyncio.run(run())
+
+    assert len(attempts) == 3
+    assert result["data"]["viewer"]["login"] == "a"
+    assert items == [1, 2, 3]
+    assert mutations[0].ok and mutations[0].data == {"issue": {"id": "I_1"}}
+
+
+class FakeResponse:
+    def __init__(self, status_code, text="", headers={}):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+
+    @property
+    def content(self):
+        return self.text.encode()
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, headers={}, data=None):
+        self.calls.append((method, url, headers))
+        return self.responses.pop(0)
+
+
+def test_client_revalidates_cached_get():
+    """Client returns the cached body when GitHub answers 304"""
+    from okazaki.api import Client, ResponseCache
+
+    session = FakeSession(
+        [
+            FakeResponse(200, '[{"number": 1}]', {"ETag": '"abc"'}),
+            FakeResponse(304),
+        ]
+    )
+    client = Client(cache=ResponseCache(max_entries=2))
+    client.get_session = lambda: session
+
+    assert client._get("https://api.github.com/issues") == [{"number": 1}]
+    assert client._get("https://api.github.com/issues") == [{"number": 1}]
+    assert session.calls[1][2]["If-None-Match"] == '"abc"'
+
+
+def test_client_coalesced_leader_changes_its_own_copy():
+    """The leader changing its result does not race the followers' copies"""
+    import json
+    import threading
+    import time
+    from okazaki.api import Client, SingleFlight
+
+    release = threading.Event()
+    body = json.dumps({str(i): i for i in range(20000)})
+
+    class SlowSession(FakeSession):
+        def request(self, method, url, headers={}, data=None):
+            release.wait(1)
+            return super().request(method, url, headers, data)
+
+    session = SlowSession([FakeResponse(200, body)])
+    client = Client(single_flight=SingleFlight())
+    client.get_session = lambda: session
+    results = []
+
+    def get(leader):
+        result = client._get("https://api.github.com/repos/a/b/labels")
+
+        if leader:
+            while result:
+                result.popitem()
+
+        results.append(len(result))
+
+    threads = [threading.Thread(target=get, args=(i == 0,)) for i in range(5)]
+    threads[0].start()
+    time.sleep(0.05)
+
+    for thread in threads[1:]:
+        thread.start()
+
+    time.sleep(0.1)
+    release.set()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(session.calls) == 1
+    assert sorted(results) == [0, 20000, 20000, 20000, 20000]
+
+
+def test_disk_cache_survives_restart(tmp_path):
+    """A new ResponseCache revalidates with the validators stored on disk"""
+    from okazaki.api import Client, ResponseCache, DiskCache
+    from okazaki.api.cache import CacheEntry
+
+    path = str(tmp_path / "cache.db")
+    session = FakeSession([FakeResponse(200, '{"id": 1}', {"ETag": '"v1"'})])
+    client = Client(cache=ResponseCache(backing=DiskCache(path)))
+    client.get_session = lambda: session
+    client._get("https://api.github.com/repos/a/b")
+
+    session = FakeSession([FakeResponse(304)])
+    client = Client(cache=ResponseCache(backing=DiskCache(path)))
+    client.get_session = lambda: session
+
+    assert client._get("https://api.github.com/repos/a/b") == {"id": 1}
+    assert session.calls[0][2]["If-None-Match"] == '"v1"'
+
+    # A new token keeps the entries of its stable cache scope
+    url = "https://api.github.com/repos/a/c"
+    session = FakeSession([FakeResponse(200, '{"id": 4}', {"ETag": '"v4"'})])
+    client = Client(
+        cache=ResponseCache(backing=DiskCache(path)), cache_scope="installation:7"
+    )
+    client.get_session = lambda: session
+    client._get(url, {"Authorization": "token old"})
+
+    session = FakeSession([FakeResponse(304)])
+    client = Client(
+        cache=ResponseCache(backing=DiskCache(path)), cache_scope="installation:7"
+    )
+    client.get_session = lambda: session
+
+    assert client._get(url, {"Authorization": "token new"}) == {"id": 4}
+
+    cache = DiskCache(path, max_bytes=15)
+    cache.set("a", CacheEntry('"a"', None, {"id": 2}))
+    cache.set("b", CacheEntry('"b"', None, {"id": 3}))
+
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_client_coalesces_concurrent_gets():
+    """Concurrent identical GETs share one request and get their own copies"""
+    import threading
+    import time
+    from okazaki.api import Client, SingleFlight
+
+    release = threading.Event()
+
+    class SlowSession(FakeSession):
+        def request(self, method, url, headers={}, data=None):
+            release.wait(1)
+            return super().request(method, url, headers, data)
+
+    session = SlowSession([FakeResponse(200, '{"labels": []}')])
+    client = Client(single_flight=SingleFlight())
+    client.get_session = lambda: session
+    results = []
+
+    def get():
+        results.append(client._get("https://api.github.com/repos/a/b/issues/1"))
+
+    threads = [threading.Thread(target=get) for _ in range(5)]
+
+    for thread in threads:
+        thread.start()
+
+    # Let the followers join the call in flight before it completes
+    time.sleep(0.1)
+    release.set()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(session.calls) == 1
+    assert results == [{"labels": []}] * 5
+    assert len({id(result) for result in results}) == 5
+
+
+def test_app_reuses_lazy_repo_handles():
+    """App hands out one lazy repository handle per TTL without fetching it"""
+    from github import Github
+    from okazaki.api import App
+
+    app = App(1, "key.pem", 2, {})
+    app._client = Github()
+
+    handle = app.get_repo("clivern/okazaki")
+
+    assert handle is app.get_repo("clivern/okazaki")
+    assert handle.url == "/repos/clivern/okazaki"
+
+    app.invalidate_repo("clivern/okazaki")
+    app.REPO_TTL = -1
+    handle = app.get_repo("clivern/okazaki")
+
+    assert handle is not app.get_repo("clivern/okazaki")
+
+
+def test_rate_limiter_waits_for_reset():
+    """RateLimiter sleeps until the reported reset once the budget is spent"""
+    from okazaki.api import RateLimiter
+
+    clock = {"now": 1000.0, "slept": []}
+    limiter = RateLimiter(rate=1, burst=1)
+    limiter._now = lambda: clock["now"]
+
+    def sleep(seconds):
+        clock["slept"].append(seconds)
+        clock["now"] += seconds
+
+    limiter._sleep = sleep
+
+    assert not limiter.update(
+        "a", 200, {"X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "1100"}
+    )
+    limiter.acquire("a")
+    limiter.acquire("a")
+
+    assert clock["slept"] == [100.0]
+    assert limiter.update("a", 429, {"Retry-After": "5"})
+
+
+def test_client_retries_idempotent_verbs_only():
+    """Client retries a failed GET but not a POST unless opted in"""
+    import pytest
+    from okazaki.api import Client
+    from okazaki.api import RetryPolicy
+    from okazaki.exception import ApiError
+
+    session = FakeSession([FakeResponse(502, "bad gateway"), FakeResponse(200, "{}")])
+    client = Client(retry=RetryPolicy(backoff_factor=0))
+    client.get_session = lambda: session
+
+    assert client._get("https://api.github.com/repos/a/b") == {}
+    assert len(session.calls) == 2
+
+    session = FakeSession([FakeResponse(502, "bad gateway"), FakeResponse(200, "{}")])
+    client.get_session = lambda: session
+
+    with pytest.raises(ApiError):
+        client._post("https://api.github.com/repos/a/b/issues")
+
+    session = FakeSession([FakeResponse(502, "bad gateway"), FakeResponse(200, "{}")])
+    client.get_session = lambda: session
+
+    assert (
+        client._post(
+            "https://api.github.com/repos/a/b/issues",
+            retry=RetryPolicy(backoff_factor=0, retry_non_idempotent=True),
+        )
+        == {}
+    )
+
+
+def test_client_paginates_with_prefetch():
+    """Client.paginate follows next links and yields every item"""
+    from okazaki.api import Client
+
+    session = FakeSession(
+        [
+            FakeResponse(200, "[1, 2]", {"Link": '<https://x/?page=2>; rel="next"'}),
+            FakeResponse(200, "[3]", {"Link": '<https://x/?page=1>; rel="prev"'}),
+        ]
+    )
+    client = Client()
+    client.get_session = lambda: session
+
+    assert list(client.paginate("https://x/?page=1", prefetch=2)) == [1, 2, 3]
+    assert session.calls[1][1] == "https://x/?page=2"
+
+
+def test_client_reuses_jwt_until_key_changes(tmp_path):
+    """Client signs one JWT per key file version"""
+    import os
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from okazaki.api import Client
+
+    def write_key(path):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        path.write_bytes(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.TraditionalOpenSSL,
+                serialization.NoEncryption(),
+            )
+        )
+
+    path = tmp_path / "app.pem"
+    write_key(path)
+    client = Client()
+    token = client._get_jwt_token(str(path), 1)
+
+    assert Client()._get_jwt_token(str(path), 1) == token
+
+    write_key(path)
+    os.utime(path, ns=(1, 1))
+
+    assert client._get_jwt_token(str(path), 1) != token
+
+
+def test_mutation_batch_chunks_and_maps_errors():
+    """MutationBatch aliases mutations, chunks them and maps errors back"""
+    import json
+    from okazaki.api import Client
+
+    session = FakeSession(
+        [
+            FakeResponse(
+                200,
+                json.dumps(
+                    {
+                        "data": {"m0": {"clientMutationId": None}, "m1": None},
+                        "errors": [{"path": ["m1"], "message": "Not found"}],
+                    }
+                ),
+            ),
+            FakeResponse(200, json.dumps({"data": {"m2": {"issue": {"id": "I"}}}})),
+        ]
+    )
+    client = Client()
+    client.get_session = lambda: session
+    batch = client.create_mutation_batch(max_cost=2)
+
+    batch.add_labels("I_1", ["L_1"])
+    batch.add_comment("I_2", "stale")
+    batch.close_issue("I_3")
+    results = batch.execute()
+
+    assert len(session.calls) == 2
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[1].error == "Not found"
+
+
+def test_client_records_metrics_per_route():
+    """Client records requests per route template, verb and status"""
+    from okazaki.api import Client, Metrics
+
+    metrics = Metrics()
+    session = FakeSession([FakeResponse(200, "{}", {"X-RateLimit-Remaining": "42"})])
+    client = Client(metrics=metrics)
+    client.get_session = lambda: session
+
+    client._get("https://api.github.com/repos/clivern/okazaki/issues/12")
+    snapshot = metrics.snapshot()
+
+    assert snapshot["requests"][0]["route"] == "/repos/{owner}/{repo}/issues/{number}"
+    assert snapshot["requests"][0]["statuses"] == {"200": 1}
+    assert snapshot["rate_limit_remaining"] == {"app": 42}
+    assert 'status="200"} 1' in metrics.to_prometheus()
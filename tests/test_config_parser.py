@@ -0,0 +1,44 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+def test_parse_auto_triage_compiles_rule_matchers():
+    """Auto triage terms are compiled once and matched as whole words"""
+    from okazaki.config import ConfigParser
+
+    config = ConfigParser().parse_auto_triage(
+        {
+            "enabled": True,
+            "wordBoundary": True,
+            "issues": [
+                {"label": "bug", "terms": ["fix", "Crash"]},
+                {"label": "enhancement", "terms": ["feature request", "feature"]},
+                {"label": "c++", "terms": ["c++"]},
+            ],
+        }
+    )
+    matcher = config.matchers["issues"]
+
+    assert matcher.match("Prefix crash", "") == [0]
+    assert matcher.match("New feature", "Support c++ please") == [1, 2]
+    assert matcher.match("Prefixed", "features") == []
+    assert config.get_matcher("pulls").match("fix") == []
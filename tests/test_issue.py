@@ -0,0 +1,269 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import pytest
+from github import RateLimitExceededException
+from github import UnknownObjectException
+from github.Issue import Issue as GithubIssue
+from okazaki.api import Issue
+from okazaki.exception import NotFound
+
+
+class FakeRequester:
+    is_not_lazy = False
+    per_page = 30
+
+    def check_me(self, obj):
+        pass
+
+    def __init__(self, status=200):
+        self.status = status
+        self.calls = []
+
+    def requestJsonAndCheck(self, verb, url, parameters=None, headers=None, input=None):
+        self.calls.append((verb, url, input))
+
+        if self.status == 404:
+            raise UnknownObjectException(404, {"message": "Not Found"}, {})
+
+        if self.status == 403:
+            raise RateLimitExceededException(403, {"message": "rate limit"}, {})
+
+        return {}, {"url": url, "id": len(self.calls)}
+
+
+class FakeRepo:
+    url = "https://api.github.com/repos/clivern/okazaki"
+
+    def __init__(self, requester):
+        self.requester = requester
+
+
+class FakeApp:
+    def __init__(self, requester):
+        self.repo = FakeRepo(requester)
+
+    def get_repo(self, repo):
+        return self.repo
+
+
+def test_issue_mutates_without_fetching():
+    """Issue sends the mutation directly and turns a 404 into NotFound"""
+    requester = FakeRequester()
+    Issue(FakeApp(requester)).close_issue("clivern/okazaki", 7)
+
+    assert requester.calls == [
+        (
+            "PATCH",
+            "https://api.github.com/repos/clivern/okazaki/issues/7",
+            {"state": "closed"},
+        )
+    ]
+
+    requester = FakeRequester(404)
+
+    with pytest.raises(NotFound):
+        Issue(FakeApp(requester)).reopen_issue("clivern/okazaki", 7)
+
+    with pytest.raises(NotFound):
+        Issue(FakeApp(requester)).close_issue("clivern/okazaki", "7")
+
+
+def test_issue_reads_raise_not_found_eagerly():
+    """Issue listings fetch their first page once and turn a 404 into NotFound"""
+
+    class ListRequester(FakeRequester):
+        def requestJsonAndCheck(self, verb, url, parameters=None, headers=None):
+            super().requestJsonAndCheck(verb, url)
+            return {}, [{"id": 1, "body": "Hello"}]
+
+    requester = ListRequester()
+    comments = Issue(FakeApp(requester)).get_comments("clivern/okazaki", 7)
+
+    assert len(requester.calls) == 1
+    assert [comment.body for comment in comments] == ["Hello"]
+    assert len(requester.calls) == 1
+
+    with pytest.raises(NotFound):
+        Issue(FakeApp(FakeRequester(404))).get_events("clivern/okazaki", 7)
+
+
+def test_issue_get_issue_gives_each_caller_its_own_issue():
+    """Coalesced get_issue calls share the request but not the Issue object"""
+    requester = FakeRequester()
+    app = FakeApp(requester)
+    results = {}
+
+    def coalesce(key, fn):
+        if key not in results:
+            results[key] = fn()
+
+        return results[key]
+
+    app.coalesce = coalesce
+
+    first = Issue(app).get_issue("clivern/okazaki", 7)
+    second = Issue(app).get_issue("clivern/okazaki", 7)
+    first.raw_data["id"] = 0
+
+    assert len(requester.calls) == 1
+    assert first is not second
+    assert second.id == 1 and second.raw_data["id"] == 1
+
+
+def test_issue_batch_merges_operations_per_issue():
+    """IssueBatch sends one PATCH per issue and skips the rest once rate limited"""
+    requester = FakeRequester()
+    url = "https://api.github.com/repos/clivern/okazaki/issues/3"
+    item = GithubIssue(
+        requester,
+        {},
+        {"url": url, "number": 3, "labels": [{"name": "bug"}, {"name": "wip"}]},
+        completed=True,
+    )
+
+    batch = Issue(FakeApp(requester)).create_batch("clivern/okazaki", max_workers=1)
+    batch.add_labels(item, ["stale"]).remove_label(item, "wip")
+    batch.close_issue(item).add_comment(item, "Closing")
+    results = batch.execute()
+
+    assert [result.ok for result in results] == [True]
+    assert requester.calls == [
+        ("PATCH", url, {"state": "closed", "labels": ["bug", "stale"]}),
+        ("POST", url + "/comments", {"body": "Closing"}),
+    ]
+
+    requester.status = 403
+    batch.close_issue(1).close_issue(2)
+    results = batch.execute()
+
+    assert results[0].error is not None and results[1].skipped
+
+
+def test_issue_batch_records_transport_errors_per_issue():
+    """A connection error fails its issue without losing the other results"""
+    import requests
+
+    class FlakyRequester(FakeRequester):
+        def requestJsonAndCheck(
+            self, verb, url, parameters=None, headers=None, input=None
+        ):
+            if url.endswith("/2"):
+                raise requests.ConnectionError("Connection reset")
+
+            return super().requestJsonAndCheck(verb, url, parameters, headers, input)
+
+    batch = Issue(FakeApp(FlakyRequester())).create_batch("clivern/okazaki", 1)
+    results = batch.close_issue(1).close_issue(2).close_issue(3).execute()
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[1].error == "Connection reset"
+
+
+def test_issue_sync_lists_only_changes_since_watermark(tmp_path):
+    """Issue.sync_issues merges updated issues into the stored snapshot"""
+    from datetime import datetime, timezone
+    from types import SimpleNamespace
+    from okazaki.api import IssueStore
+
+    def item(number, state, day):
+        return SimpleNamespace(
+            number=number,
+            state=state,
+            pull_request=None,
+            updated_at=datetime(2024, 1, day, tzinfo=timezone.utc),
+            labels=[SimpleNamespace(name="bug")],
+        )
+
+    class Repo:
+        def __init__(self, items):
+            self.items = items
+            self.calls = []
+
+        def get_issues(self, **kwargs):
+            self.calls.append(kwargs)
+            return self.items
+
+    store = IssueStore(str(tmp_path / "issues.db"))
+    app = FakeApp(None)
+    app.repo = Repo([item(1, "open", 1), item(2, "open", 3)])
+    Issue(app).sync_issues("clivern/okazaki", store)
+
+    app.repo = Repo([item(1, "closed", 5)])
+    changed = Issue(app).sync_issues("clivern/okazaki", store)
+
+    assert [issue.number for issue in changed] == [1]
+    assert app.repo.calls[0]["since"] == datetime(2024, 1, 3, tzinfo=timezone.utc)
+    assert [issue.number for issue in store.get_issues("clivern/okazaki")] == [2]
+    assert store.get_watermark("clivern/okazaki") == "2024-01-05T00:00:00+00:00"
+
+
+def test_issue_resolves_labels_from_one_listing():
+    """Issue.get_labels lists the labels once until a label changes"""
+    from types import SimpleNamespace
+    from okazaki.api import App, Label
+
+    class Repo:
+        listings = 0
+
+        def get_labels(self):
+            Repo.listings += 1
+            return [SimpleNamespace(name="Bug"), SimpleNamespace(name="triaged")]
+
+        def create_label(self, name, color, description):
+            return SimpleNamespace(name=name)
+
+    app = App(1, "key.pem", 2, {})
+    app._client = SimpleNamespace(get_repo=lambda repo, lazy: Repo())
+    issue = Issue(app)
+
+    assert [label.name for label in issue.get_labels("a/b", ["bug"])] == ["Bug"]
+    assert len(issue.get_labels("a/b", ["bug", "triaged"])) == 2
+    assert Repo.listings == 1
+
+    with pytest.raises(NotFound, match="stale, wip"):
+        issue.get_labels("a/b", ["bug", "stale", "wip"])
+
+    Label(app).create_label("a/b", "stale")
+    issue.get_labels("a/b", ["triaged"])
+
+    assert Repo.listings == 2
+
+
+def test_issue_iter_items_lists_once():
+    """Issue.iter_items sorts one listing into issues and pull requests"""
+    from types import SimpleNamespace
+
+    listings = []
+    items = [
+        SimpleNamespace(number=1, pull_request=None),
+        SimpleNamespace(number=2, pull_request=object()),
+    ]
+    issue = Issue(None)
+    issue.get_issues = lambda repo, state: listings.append(state) or items
+
+    assert [(kind, item.number) for kind, item in issue.iter_items("a/b")] == [
+        ("issues", 1),
+        ("pulls", 2),
+    ]
+    assert listings == ["open"]
@@ -0,0 +1,129 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from types import SimpleNamespace
+
+
+class FakeLabel:
+    def __init__(self, name, color, description=None):
+        self.name = name
+        self.color = color
+        self.description = description
+        self.calls = []
+
+    def edit(self, name, color, description):
+        self.calls.append(("edit", name, color, description))
+
+    def delete(self):
+        self.calls.append(("delete",))
+
+
+def test_labels_plugin_plans_and_applies_on_held_labels():
+    """LabelsV1Plugin returns its plan and changes the listed labels directly"""
+    from okazaki.config.config_parser import Label as CfgLabel
+    from okazaki.plugins import LabelsV1Plugin
+
+    bug = FakeLabel("bug", "d73a4a", "Something isn't working")
+    wip = FakeLabel("wip", "ffffff")
+    stale = FakeLabel("stale", "fbca04", "Old")
+    created = []
+
+    class Repo:
+        def get_labels(self):
+            return [bug, wip, stale]
+
+        def create_label(self, name, color, description):
+            created.append(name)
+
+    app = SimpleNamespace(
+        get_repo=lambda repo: Repo(), invalidate_labels=lambda repo: None
+    )
+    cfg_labels = [
+        CfgLabel("bug", "Something isn't working", "d73a4a"),
+        CfgLabel("stale", "No recent activity", "fbca04"),
+        CfgLabel("pinned", "Pinned", "0052cc"),
+    ]
+
+    plan = LabelsV1Plugin(app, "a/b", cfg_labels).run()
+
+    assert [label.name for label in plan.create] == ["pinned"]
+    assert [pair[0] for pair in plan.update] == [stale]
+    assert plan.delete == [wip]
+    assert created == ["pinned"]
+    assert stale.calls == [("edit", "stale", "fbca04", "No recent activity")]
+    assert wip.calls == [("delete",)] and bug.calls == []
+
+
+def test_labels_fleet_sync_skips_unchanged_repositories(tmp_path):
+    """LabelsV1FleetSync skips a synced repository after one conditional request"""
+    from okazaki.api import App, LabelStore
+    from okazaki.config.config_parser import Label as CfgLabel
+    from okazaki.plugins import LabelsV1FleetSync
+
+    class Response:
+        def __init__(self, status_code, text=""):
+            self.status_code = status_code
+            self.text = text
+            self.headers = {"ETag": '"v1"'}
+
+    class Session:
+        def __init__(self, responses):
+            self.responses = responses
+            self.calls = []
+
+        def request(self, method, url, headers={}, data=None):
+            self.calls.append(headers)
+            return self.responses.pop(0)
+
+    class Repo:
+        def get_labels(self):
+            return [FakeLabel("bug", "d73a4a", "Broken")]
+
+    session = Session(
+        [
+            Response(
+                200, '[{"name": "bug", "color": "d73a4a", "description": "Broken"}]'
+            ),
+            Response(304),
+        ]
+    )
+    app = App(1, "key.pem", 2, {})
+    app._auth = SimpleNamespace(token="token")
+    app._client = SimpleNamespace(get_repo=lambda repo, lazy: Repo())
+    app.get_session = lambda: session
+    cfg_labels = [CfgLabel("bug", "Broken", "d73a4a")]
+    store = LabelStore(str(tmp_path / "labels.db"))
+
+    first = LabelsV1FleetSync(app, ["a/b"], cfg_labels, store).run()
+    second = LabelsV1FleetSync(app, ["a/b"], cfg_labels, store).run()
+    recolored = LabelsV1FleetSync(
+        app, ["a/b"], [CfgLabel("bug", "Broken", "ffffff")], store
+    )
+
+    assert first[0].plan.empty and not first[0].skipped
+    assert second[0].skipped
+    assert session.calls[1]["If-None-Match"] == '"v1"'
+    assert store.get("a/b").checksum == LabelStore.get_fingerprint(
+        [{"name": "bug", "color": "d73a4a", "description": "Broken"}]
+    )
+    assert recolored._checksum != store.get("a/b").checksum
@@ -0,0 +1,214 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from dateutil.tz import tzutc
+
+
+class FakeBatch:
+    def __init__(self):
+        self.marked = []
+        self.closed = []
+
+    def add_labels(self, item, labels):
+        # Like the PATCH response, refresh the labels and update time
+        self.marked.append(item.number)
+        item.labels = [SimpleNamespace(name=label) for label in labels]
+        item.updated_at = datetime.now(tzutc())
+
+    def add_comment(self, item, body):
+        pass
+
+    def close_issue(self, item):
+        self.closed.append(item.number)
+
+    def execute(self):
+        return []
+
+
+def test_stale_schedule_mode_processes_due_items_only(tmp_path):
+    """StaleV1Plugin in schedule mode only evaluates items that are due"""
+    from okazaki.api import IssueStore
+    from okazaki.config.config_parser import StaleConfig
+    from okazaki.plugins import StaleV1Plugin
+
+    now = datetime.now(tzutc())
+    rules = {
+        "daysUntilStale": 30,
+        "daysUntilClose": 7,
+        "staleLabel": "stale",
+        "markComment": "Stale",
+        "closeComment": "Closed",
+    }
+
+    def item(number, days_ago):
+        return SimpleNamespace(
+            number=number,
+            state="open",
+            pull_request=None,
+            labels=[],
+            updated_at=now - timedelta(days=days_ago),
+        )
+
+    store = IssueStore(str(tmp_path / "issues.db"))
+    plugin = StaleV1Plugin(
+        None, "a/b", StaleConfig(True, rules, rules, [], "schedule"), None, store
+    )
+    batch = FakeBatch()
+    plugin._issue.create_batch = lambda repo: batch
+    plugin._issue.sync_issues = lambda repo, store: [item(1, 45), item(2, 5)]
+    plugin.run()
+
+    assert batch.marked == [1]
+
+    plugin._issue.sync_issues = lambda repo, store: []
+    plugin.run()
+
+    assert batch.marked == [1]
+    assert store.get_due("a/b", (now + timedelta(days=26)).timestamp()) == [2]
+
+    # Due items are only rescheduled once their changes are applied
+    store.set_due("a/b", [(3, now.timestamp())])
+    plugin._issue.sync_issues = lambda repo, store: [item(4, 45)]
+    plugin._issue.get_issue = lambda repo, number: None
+    batch.execute = lambda: 1 / 0
+
+    with pytest.raises(ZeroDivisionError):
+        plugin.run()
+
+    assert sorted(store.get_due("a/b", datetime.now(tzutc()).timestamp())) == [3, 4]
+
+
+def test_stale_search_queries_and_candidates():
+    """Search mode builds mark and close queries and still applies the rules"""
+    from okazaki.config.config_parser import StaleConfig
+    from okazaki.plugins import StaleV1Plugin
+
+    now = datetime(2024, 3, 1, tzinfo=tzutc())
+    rules = {
+        "daysUntilStale": 30,
+        "daysUntilClose": 7,
+        "staleLabel": "no activity",
+        "markComment": "Stale",
+        "closeComment": "Closed",
+    }
+    config = StaleConfig(True, rules, rules, ["help wanted", "bug"], "search")
+    plugin = StaleV1Plugin(None, "a/b", config, None)
+    base = 'repo:a/b is:{} is:open -label:"help wanted" -label:"bug"'
+
+    assert plugin._get_search_queries("issue", rules, now) == [
+        base.format("issue") + ' -label:"no activity" updated:<=2024-01-31T00:00:00Z',
+        base.format("issue") + ' label:"no activity" updated:<=2024-01-24T00:00:00Z',
+    ]
+    assert plugin._get_search_queries("pr", rules, now)[0].startswith(
+        base.format("pr") + " "
+    )
+
+    def item(number, days_ago, labels=[]):
+        return SimpleNamespace(
+            number=number,
+            state="open",
+            pull_request=None,
+            labels=[SimpleNamespace(name=label) for label in labels],
+            updated_at=datetime.now(tzutc()) - timedelta(days=days_ago),
+        )
+
+    queries = []
+    batch = FakeBatch()
+    plugin._issue.create_batch = lambda repo: batch
+
+    def search_issues(query):
+        queries.append(query)
+
+        if query.startswith(base.format("issue") + ' -label:"no activity"'):
+            # Only item 1 is past the cutoff, the rules reject item 2
+            return [item(1, 45), item(2, 5)]
+
+        if query.startswith(base.format("issue") + ' label:"no activity"'):
+            return [item(3, 40, ["no activity"])]
+
+        return []
+
+    plugin._issue.search_issues = search_issues
+    plugin.run()
+
+    assert len(queries) == 4
+    assert batch.marked == [1]
+    assert batch.closed == [3]
+
+
+def test_stale_schedule_mode_reschedules_when_rules_change(tmp_path):
+    """Changed stale rules reschedule every item instead of keeping old due times"""
+    from okazaki.api import IssueStore
+    from okazaki.config.config_parser import StaleConfig
+    from okazaki.plugins import StaleV1Plugin
+
+    now = datetime.now(tzutc())
+    items = [
+        SimpleNamespace(
+            number=number,
+            state="open",
+            pull_request=None,
+            labels=[SimpleNamespace(name=label) for label in labels],
+            updated_at=now - timedelta(days=40),
+        )
+        for number, labels in [(1, []), (2, ["pinned"])]
+    ]
+
+    def sync_issues(repo, store):
+        # Like a real sync, only the first one after a reset lists every item
+        if store.get_watermark(repo) is not None:
+            return []
+
+        store.merge(repo, [], now.isoformat())
+        return items
+
+    def run(days, exempt):
+        rules = {
+            "daysUntilStale": days,
+            "daysUntilClose": 7,
+            "staleLabel": "stale",
+            "markComment": "Stale",
+            "closeComment": "Closed",
+        }
+        plugin = StaleV1Plugin(
+            None,
+            "a/b",
+            StaleConfig(True, rules, rules, exempt, "schedule"),
+            None,
+            store,
+        )
+        batch = FakeBatch()
+        plugin._issue.create_batch = lambda repo: batch
+        plugin._issue.sync_issues = sync_issues
+        plugin.run()
+
+        return batch.marked
+
+    store = IssueStore(str(tmp_path / "issues.db"))
+
+    assert run(60, ["pinned"]) == []
+    assert run(60, ["pinned"]) == []
+    assert sorted(run(30, [])) == [1, 2]
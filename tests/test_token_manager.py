@@ -0,0 +1,104 @@
+# MIT License
+#
+# Copyright (c) 2022 Clivern
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import threading
+import time
+from okazaki.api import Client
+from okazaki.api import TokenManager
+
+
+class FakeClient(Client):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def fetch_access_token(self, private_key_path, app_id, installation_id):
+        self.calls += 1
+        time.sleep(0.05)
+        return {
+            "token": "token-{}".format(self.calls),
+            "expires_at": "2999-01-01T00:00:00Z",
+            "permissions": {"issues": "write"},
+        }
+
+
+def test_token_manager_single_flight(tmp_path):
+    """Concurrent callers share one token request and it is persisted"""
+    client = FakeClient()
+    path = str(tmp_path / "tokens.json")
+    manager = TokenManager(client, "key.pem", 1, persist_path=path)
+
+    threads = [threading.Thread(target=manager.get_token, args=(7,)) for _ in range(5)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert client.calls == 1
+    assert TokenManager(client, "key.pem", 1, persist_path=path).get_token(7) == {
+        "token": "token-1",
+        "expires_at": "2999-01-01T00:00:00Z",
+        "permissions": {"issues": "write"},
+    }
+    assert client.calls == 1
+
+
+def test_get_app_reuses_managed_token(monkeypatch):
+    """get_app and the first PyGithub call share one minted token"""
+    from okazaki import helpers
+
+    client = FakeClient()
+    manager = TokenManager(client, "key.pem", 1)
+    monkeypatch.setitem(helpers._token_managers, (1, "key.pem"), manager)
+    sent = []
+
+    class FakeResponse:
+        status = 200
+
+        def getheaders(self):
+            return []
+
+        def read(self):
+            return '{"login": "bot"}'
+
+    class FakeConnection:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def request(self, verb, url, input, headers, stream=False):
+            sent.append(headers["Authorization"])
+
+        def getresponse(self):
+            return FakeResponse()
+
+        def close(self):
+            pass
+
+    app = helpers.get_app(1, 7, "key.pem")
+    requester = app.get_client().requester
+    requester._Requester__connectionClass = FakeConnection
+    requester.requestJsonAndCheck("GET", "/user")
+
+    assert sent == ["token token-1"]
+    assert client.calls == 1